@@ -1 +1 @@
-python3 src/main.py
\ No newline at end of file
+python3 src/main.py build --template template.html "$@"
\ No newline at end of file
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from writer import remove_output
+
+ASSET_MANIFEST_NAME = ".asset-manifest.json"
+
+
+def find_static_files(static_dir):
+    files = []
+    for root, _, names in os.walk(static_dir):
+        for name in names:
+            files.append(os.path.relpath(os.path.join(root, name), static_dir))
+    return sorted(files)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hashed_name(asset, digest):
+    root, ext = os.path.splitext(asset)
+    return f"{root}.{digest[:10]}{ext}"
+
+
+def asset_url(asset):
+    return "/" + asset.replace(os.sep, "/")
+
+
+def load_asset_manifest(public_dir):
+    try:
+        with open(os.path.join(public_dir, ASSET_MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_asset_manifest(public_dir, entries):
+    path = os.path.join(public_dir, ASSET_MANIFEST_NAME)
+    os.makedirs(public_dir, exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def same_file(source, target, source_stat):
+    # Cheap checks first: size, then mtime (copy2 preserves it). Only equal
+    # sizes with different mtimes need their contents hashed.
+    try:
+        target_stat = os.stat(target)
+    except FileNotFoundError:
+        return False
+    if target_stat.st_size != source_stat.st_size:
+        return False
+    if target_stat.st_mtime_ns == source_stat.st_mtime_ns:
+        return True
+    if file_hash(source) != file_hash(target):
+        return False
+    os.utime(target, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    return True
+
+
+def copy_asset(source, target, source_stat):
+    if same_file(source, target, source_stat):
+        return False
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp_path = os.path.join(os.path.dirname(target), "." + os.path.basename(target) + ".tmp")
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+    return True
+
+
+class AssetResult:
+    def __init__(self, urls, copied, skipped, removed):
+        self.urls = urls
+        self.copied = copied
+        self.skipped = skipped
+        self.removed = removed
+
+    def __repr__(self):
+        return f"AssetResult({len(self.copied)} copied, {len(self.skipped)} skipped, {len(self.removed)} removed)"
+
+
+def sync_assets(static_dir, public_dir, hashed=False, workers=8):
+    if not os.path.isdir(static_dir):
+        raise FileNotFoundError(f"Static directory not found: {static_dir}")
+    previous = load_asset_manifest(public_dir)
+    entries = {}
+    jobs = []
+    for asset in find_static_files(static_dir):
+        source = os.path.join(static_dir, asset)
+        stat = os.stat(source)
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "output": asset}
+        if hashed:
+            old = previous.get(asset)
+            if old and old.get("digest") and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime_ns:
+                entry["digest"] = old["digest"]
+            else:
+                entry["digest"] = file_hash(source)
+            entry["output"] = hashed_name(asset, entry["digest"])
+        entries[asset] = entry
+        jobs.append((asset, source, os.path.join(public_dir, entry["output"]), stat))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        changed = list(executor.map(lambda job: copy_asset(*job[1:]), jobs))
+    copied = [job[0] for job, was_copied in zip(jobs, changed) if was_copied]
+    skipped = [job[0] for job, was_copied in zip(jobs, changed) if not was_copied]
+
+    outputs = {entry["output"] for entry in entries.values()}
+    removed = sorted(entry["output"] for entry in previous.values() if entry["output"] not in outputs)
+    for output in removed:
+        remove_output(public_dir, output)
+
+    save_asset_manifest(public_dir, entries)
+    urls = {asset_url(asset): asset_url(entry["output"]) for asset, entry in entries.items() if hashed}
+    return AssetResult(urls, copied, skipped, removed)
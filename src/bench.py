@@ -0,0 +1,330 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from blocktype import BlockType, block_to_block_type, map_blocks, parse_blocks
+from build import build_site
+from functions import (
+    blocks_to_html_node,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    text_node_to_html_node,
+    text_to_textnodes,
+)
+
+STAGES = ("markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "text_node_to_html_node",
+          "blocks_to_html_node", "to_html")
+
+WORDS = "the quick brown fox jumps over lazy dog static site generator markdown html node".split()
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_markup(rng, count):
+    parts = []
+    for _ in range(count):
+        kind = rng.randrange(6)
+        if kind == 0:
+            parts.append(f"**{words(rng, 2)}**")
+        elif kind == 1:
+            parts.append(f"_{words(rng, 2)}_")
+        elif kind == 2:
+            parts.append(f"`{words(rng, 1)}`")
+        elif kind == 3:
+            parts.append(f"[{words(rng, 2)}](https://example.com/{rng.randrange(1000)})")
+        elif kind == 4:
+            parts.append(f"![{words(rng, 1)}](/images/{rng.randrange(1000)}.png)")
+        else:
+            parts.append(words(rng, 4))
+    return " ".join(parts)
+
+
+def small_page(rng):
+    return "\n\n".join([
+        f"# {words(rng, 3)}",
+        words(rng, 40),
+        "\n".join(f"- {words(rng, 4)}" for _ in range(3)),
+        "```\n" + words(rng, 10) + "\n```",
+    ])
+
+
+def huge_page(rng):
+    blocks = []
+    for i in range(2000):
+        if i % 50 == 0:
+            blocks.append(f"## {words(rng, 3)}")
+        blocks.append(words(rng, 60))
+    return "\n\n".join(blocks)
+
+
+def inline_heavy_page(rng):
+    return "\n\n".join(inline_markup(rng, 80) for _ in range(100))
+
+
+def long_lists_page(rng):
+    blocks = []
+    for _ in range(50):
+        blocks.append("\n".join(f"- {inline_markup(rng, 2)}" for _ in range(40)))
+        blocks.append("\n".join(f"{i}. {words(rng, 5)}" for i in range(1, 41)))
+    return "\n\n".join(blocks)
+
+
+def nested_list(rng, depth, width):
+    # Every item but the last at each level opens a sublist, indented two
+    # spaces per level; ordered and unordered levels alternate.
+    lines = []
+
+    def add(level):
+        for i in range(1, width + 1):
+            marker = f"{i}." if level % 2 else "-"
+            lines.append(f"{'  ' * level}{marker} {inline_markup(rng, 1)}")
+            if level + 1 < depth and i < width:
+                add(level + 1)
+
+    add(0)
+    return "\n".join(lines)
+
+
+def nested_quote(rng, depth):
+    lines = []
+    for level in list(range(1, depth + 1)) + list(range(depth - 1, 0, -1)):
+        lines.extend(">" * level + " " + inline_markup(rng, 2) for _ in range(2))
+    return "\n".join(lines)
+
+
+def deep_lists_page(rng):
+    blocks = []
+    for _ in range(20):
+        blocks.append(nested_list(rng, 5, 3))
+        blocks.append(nested_quote(rng, 3))
+    return "\n\n".join(blocks)
+
+
+def links_and_images_page(rng):
+    paragraphs = []
+    for _ in range(100):
+        parts = []
+        for _ in range(40):
+            if rng.random() < 0.5:
+                parts.append(f"[{words(rng, 2)}](https://example.com/{rng.randrange(10000)})")
+            else:
+                parts.append(f"![{words(rng, 1)}](/img/{rng.randrange(10000)}.png)")
+        paragraphs.append(" and ".join(parts))
+    return "\n\n".join(paragraphs)
+
+
+CORPORA = {
+    "small_pages": (small_page, 200),
+    "huge_page": (huge_page, 1),
+    "inline_heavy": (inline_heavy_page, 2),
+    "long_lists": (long_lists_page, 2),
+    "deep_lists": (deep_lists_page, 2),
+    "links_and_images": (links_and_images_page, 2),
+}
+
+
+def make_corpus(name, scale=1, seed=0):
+    factory, count = CORPORA[name]
+    rng = random.Random(f"{name}:{seed}")
+    return [factory(rng) for _ in range(max(1, int(count * scale)))]
+
+
+def best_time(func, repeat):
+    # Like timeit: keep the garbage collector out of the measurement and
+    # report the fastest run, which is the least disturbed by other load.
+    best = None
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def bench_corpus(docs, repeat):
+    blocks = [block for doc in docs for block in markdown_to_blocks(doc)]
+    inline_texts = [" ".join(block.split("\n")) for block in blocks
+                    if block_to_block_type(block) != BlockType.CODE]
+    text_nodes = [node for text in inline_texts for node in text_to_textnodes(text)]
+    typed_blocks = [list(parse_blocks(doc.split("\n"))) for doc in docs]
+    trees = [markdown_to_html_node(doc) for doc in docs]
+
+    def run_blocks():
+        for doc in docs:
+            markdown_to_blocks(doc)
+
+    def run_types():
+        for block in blocks:
+            block_to_block_type(block)
+
+    def run_inline():
+        for text in inline_texts:
+            text_to_textnodes(text)
+
+    def run_convert():
+        for node in text_nodes:
+            text_node_to_html_node(node)
+
+    def run_tree():
+        # Whole tree building, inline parsing included: where the list and
+        # quote builders show up.
+        for doc_blocks in typed_blocks:
+            blocks_to_html_node(doc_blocks)
+
+    def run_html():
+        for tree in trees:
+            tree.to_html()
+
+    runs = (run_blocks, run_types, run_inline, run_convert, run_tree, run_html)
+    return {stage: best_time(run, repeat) for stage, run in zip(STAGES, runs)}
+
+
+def run_suite(scale=1, repeat=5):
+    results = {}
+    for name in CORPORA:
+        results[name] = bench_corpus(make_corpus(name, scale), repeat)
+    return {
+        "python": platform.python_version(),
+        "scale": scale,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def write_large_input(path, megabytes, seed=0):
+    # A few MB of mixed generated pages, repeated up to the requested size.
+    rng = random.Random(f"large:{seed}")
+    sample = "\n\n".join(
+        factory(rng) for factory in (small_page, inline_heavy_page, long_lists_page) for _ in range(3)
+    ).encode("utf-8") + b"\n\n"
+    target = megabytes << 20
+    written = 0
+    with open(path, "wb") as f:
+        while written < target:
+            f.write(sample)
+            written += len(sample)
+    return written
+
+
+def peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def parse_large_input(path, mode):
+    # Runs in a fresh process so its peak RSS covers this parse only.
+    start = time.perf_counter()
+    count = 0
+    if mode == "mmap":
+        blocks = map_blocks(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            blocks = ((block_to_block_type(block), block) for block in markdown_to_blocks(f.read()))
+    for block_type, block in blocks:
+        if block_type != BlockType.CODE:
+            text_to_textnodes(" ".join(block.split("\n")))
+        count += 1
+    return {"seconds": time.perf_counter() - start, "blocks": count, "peak_rss": peak_rss()}
+
+
+def build_large_input(content_dir, public_dir):
+    # The whole pipeline on the same file: parsing, rendering and writing
+    # the page, in a fresh process like parse_large_input.
+    start = time.perf_counter()
+    result = build_site(content_dir, public_dir, workers=1)
+    return {"seconds": time.perf_counter() - start, "pages": len(result.rendered), "peak_rss": peak_rss()}
+
+
+LARGE_INPUT_MODES = ("read_split", "mmap", "build_site")
+
+
+def bench_large_input(megabytes):
+    with tempfile.TemporaryDirectory() as tmp:
+        content_dir = os.path.join(tmp, "content")
+        os.makedirs(content_dir)
+        path = os.path.join(content_dir, "large.md")
+        size = write_large_input(path, megabytes)
+        report = {"bytes": size}
+        context = multiprocessing.get_context("spawn")
+        for mode in LARGE_INPUT_MODES:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                if mode == "build_site":
+                    future = executor.submit(build_large_input, content_dir, os.path.join(tmp, "public"))
+                else:
+                    future = executor.submit(parse_large_input, path, mode)
+                report[mode] = future.result()
+    return report
+
+
+def compare(current, baseline, tolerance):
+    regressions = []
+    for corpus, stages in current["results"].items():
+        for stage, seconds in stages.items():
+            before = baseline.get("results", {}).get(corpus, {}).get(stage)
+            if before and seconds > before * (1 + tolerance):
+                regressions.append((corpus, stage, before, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.py")
+    parser.add_argument("--output", default="bench_output.txt")
+    parser.add_argument("--baseline", help="compare against a previous --output/--save-baseline file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also store the results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a stage counts as a regression (default: 0.25)")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--large-input", type=int, nargs="?", const=500, default=None, metavar="MB",
+                        help="also parse and build one generated MB-sized file and report peak RSS (default: 500)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.scale, args.repeat)
+    if args.large_input is not None:
+        report["large_input"] = bench_large_input(args.large_input)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    for corpus, stages in report["results"].items():
+        print(corpus)
+        for stage, seconds in stages.items():
+            print(f"  {stage:<24} {seconds * 1000:10.3f} ms")
+    if "large_input" in report:
+        large = report["large_input"]
+        print(f"large_input ({large['bytes'] / (1 << 20):.0f} MB)")
+        for mode in LARGE_INPUT_MODES:
+            result = large[mode]
+            print(f"  {mode:<24} {result['seconds']:10.3f} s   peak RSS {result['peak_rss'] / (1 << 20):8.1f} MB")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for corpus, stage, before, after in regressions:
+            print(f"REGRESSION {corpus}/{stage}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
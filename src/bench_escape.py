@@ -0,0 +1,58 @@
+import html
+
+from bench import best_time, make_corpus
+from functions import markdown_to_html_node
+import htmlnode
+from htmlnode import LeafNode
+
+
+def raw_to_html(self):
+    if self.value == None:
+        raise ValueError("No Value!")
+    if self.tag == None:
+        return self.value
+    props = "".join(f' {key}="{value}"' for key, value in (self.props or {}).items())
+    return f"<{self.tag}{props}>{self.value}</{self.tag}>"
+
+
+def naive_to_html(self):
+    if self.value == None:
+        raise ValueError("No Value!")
+    if self.tag == None:
+        return html.escape(self.value, quote=False)
+    props = "".join(f' {key}="{html.escape(str(value))}"' for key, value in (self.props or {}).items())
+    return f"<{self.tag}{props}>{html.escape(self.value, quote=False)}</{self.tag}>"
+
+
+def time_to_html(trees, variants, rounds=15):
+    # Alternate between variants so background load hits them all alike,
+    # keeping each one's fastest round.
+    original = LeafNode.to_html
+    best = [None] * len(variants)
+    try:
+        for _ in range(rounds):
+            for i, (_, to_html) in enumerate(variants):
+                LeafNode.to_html = to_html
+                seconds = best_time(lambda: [tree.to_html() for tree in trees], 1)
+                best[i] = seconds if best[i] is None else min(best[i], seconds)
+    finally:
+        LeafNode.to_html = original
+    return best
+
+
+def main():
+    variants = [
+        ("raw", raw_to_html),
+        ("html.escape", naive_to_html),
+        ("fast path", htmlnode.LeafNode.to_html),
+    ]
+    print(f"{'corpus':<18}" + "".join(f"{name:>14}" for name, _ in variants) + "   overhead")
+    for corpus in ("small_pages", "huge_page", "links_and_images"):
+        trees = [markdown_to_html_node(doc) for doc in make_corpus(corpus)]
+        times = time_to_html(trees, variants)
+        row = "".join(f"{seconds * 1000:11.2f} ms" for seconds in times)
+        print(f"{corpus:<18}{row}   {times[2] / times[0] - 1:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import timeit
+
+from textnode import TextNode, TextType
+from functions import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+
+
+def staged_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = list(split_nodes_delimiter(nodes, "`", TextType.CODE))
+    nodes = list(split_nodes_delimiter(nodes, "**", TextType.BOLD))
+    nodes = list(split_nodes_delimiter(nodes, "_", TextType.ITALIC))
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+SENTENCE = (
+    "Some **bold** words, an _italic_ aside, a `code span`, "
+    "an ![image](https://example.com/img.png) and a [link](https://example.com). "
+)
+
+
+def make_paragraph(size):
+    return SENTENCE * (size // len(SENTENCE) + 1)
+
+
+def main():
+    for size in (10_000, 100_000, 1_000_000):
+        text = make_paragraph(size)
+        assert text_to_textnodes(text) == staged_text_to_textnodes(text)
+        number = max(1, 1_000_000 // size)
+        staged = min(timeit.repeat(lambda: staged_text_to_textnodes(text), number=number, repeat=5)) / number
+        single = min(timeit.repeat(lambda: text_to_textnodes(text), number=number, repeat=5)) / number
+        print(
+            f"{len(text) // 1000:>5} KB  staged {staged * 1000:8.2f} ms  "
+            f"single-pass {single * 1000:8.2f} ms  speedup {staged / single:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import tracemalloc
+
+from textnode import TextNode, TextType
+from htmlnode import LeafNode
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def bytes_per_node(factory, count=100_000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list itself holds one pointer per node; leave it out.
+    return (after - before) / len(nodes) - 8
+
+
+def main():
+    text = "shared text"
+    cases = [
+        ("TextNode", lambda i: DictTextNode(text, TextType.TEXT), lambda i: TextNode(text, TextType.TEXT)),
+        ("LeafNode", lambda i: DictLeafNode("b", text), lambda i: LeafNode("b", text)),
+    ]
+    for name, before, after in cases:
+        dict_size = bytes_per_node(before)
+        slot_size = bytes_per_node(after)
+        print(f"{name:<10} __dict__ {dict_size:6.1f} B/node  __slots__ {slot_size:6.1f} B/node")
+
+
+if __name__ == "__main__":
+    main()
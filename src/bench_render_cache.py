@@ -0,0 +1,56 @@
+import random
+
+from bench import best_time, make_corpus, small_page, words
+from functions import markdown_to_html_node, set_render_cache
+from lrucache import LRUCache
+
+FOOTER = (
+    "This page is part of the **project** documentation, released under the "
+    "[MIT license](https://example.com/license). See [contributing](/contributing.html) "
+    "for how to report problems or suggest improvements."
+)
+NOTICE = "> **Deprecated:** this API will be removed in the _next_ major release.\n> Use [the new API](/api/v2.html) instead."
+SAMPLE = "```\nfrom site import build\n\nbuild('content', 'public', workers=4)\n```"
+NAV = "\n".join(f"- [{name}](/{name}.html)" for name in ("home", "guide", "api", "faq", "changelog", "about"))
+
+
+def shared_page(rng):
+    # Unique prose between includes that every page carries.
+    return "\n\n".join([NAV, small_page(rng), NOTICE, words(rng, 50), SAMPLE, FOOTER])
+
+
+def time_render(docs, cache_size, rounds=15):
+    # Alternates uncached and cached runs so background load hits both
+    # alike; each cached run starts empty, so first sightings are misses.
+    best = [None, None]
+    counters = None
+    for _ in range(rounds):
+        for i, size in enumerate((0, cache_size)):
+            cache = LRUCache(size) if size else None
+            previous = set_render_cache(cache)
+            try:
+                seconds = best_time(lambda: [markdown_to_html_node(doc).to_html() for doc in docs], 1)
+            finally:
+                set_render_cache(previous)
+            best[i] = seconds if best[i] is None else min(best[i], seconds)
+            if cache is not None:
+                counters = cache.counters()
+    return best, counters
+
+
+def main():
+    rng = random.Random("shared")
+    corpora = {
+        "shared_fragments": [shared_page(rng) for _ in range(300)],
+        "small_pages": make_corpus("small_pages"),
+        "long_lists": make_corpus("long_lists"),
+    }
+    print(f"{'corpus':<18}{'no cache':>12}{'cache':>12}   change   hit rate")
+    for name, docs in corpora.items():
+        (plain, cached), counters = time_render(docs, 4096)
+        rate = counters["hits"] / (counters["hits"] + counters["misses"])
+        print(f"{name:<18}{plain * 1000:9.2f} ms{cached * 1000:9.2f} ms   {cached / plain - 1:+6.1%}   {rate:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import re
+import timeit
+
+from textnode import TextNode, TextType
+from htmlnode import LeafNode
+from functions import split_nodes_image, split_nodes_link, text_node_to_html_node
+
+
+def legacy_split_nodes(old_nodes, find_pattern, split_pattern, text_type):
+    new_nodes = []
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT:
+            new_nodes.append(node)
+            continue
+        matches = re.findall(find_pattern, node.text)
+        if not matches:
+            new_nodes.append(node)
+            continue
+        parts = re.split(split_pattern, node.text)
+        for i, part in enumerate(parts):
+            if part:
+                new_nodes.append(TextNode(part, TextType.TEXT))
+            if i < len(matches):
+                new_nodes.append(TextNode(matches[i][0], text_type, matches[i][1]))
+    return new_nodes
+
+
+def legacy_split(nodes):
+    nodes = legacy_split_nodes(nodes, r"!\[([^\]]+)\]\(([^)]+)\)", r"!\[[^\]]+\]\([^)]+\)", TextType.IMAGE)
+    return legacy_split_nodes(nodes, r"(?<!!)\[([^\]]+)\]\(([^)]+)\)", r"(?<!!)\[[^\]]+\]\([^)]+\)", TextType.LINK)
+
+
+def legacy_text_node_to_html_node(text_node):
+    if text_node.text_type == TextType.TEXT:
+        return LeafNode(None, text_node.text)
+    if text_node.text_type == TextType.BOLD:
+        return LeafNode("b", text_node.text)
+    if text_node.text_type == TextType.ITALIC:
+        return LeafNode("i", text_node.text)
+    if text_node.text_type == TextType.CODE:
+        return LeafNode("code", text_node.text)
+    if text_node.text_type == TextType.LINK:
+        return LeafNode("a", text_node.text, {"href": text_node.url})
+    if text_node.text_type == TextType.IMAGE:
+        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+    raise ValueError(f"invalid text type: {text_node.text_type}")
+
+
+def make_nodes(count):
+    text = " ".join(
+        f"see [page {i}](https://example.com/{i}) and ![figure {i}](/img/{i}.png)" for i in range(20)
+    )
+    return [TextNode(text, TextType.TEXT) for _ in range(count)]
+
+
+def per_node(func, produced):
+    seconds = min(timeit.repeat(func, number=1, repeat=5))
+    return produced / seconds
+
+
+def main():
+    nodes = make_nodes(500)
+    split = split_nodes_link(split_nodes_image(nodes))
+    assert split == legacy_split(nodes)
+    old = per_node(lambda: legacy_split(nodes), len(split))
+    new = per_node(lambda: split_nodes_link(split_nodes_image(nodes)), len(split))
+    print(f"split image+link   legacy {old:12,.0f} nodes/s  compiled {new:12,.0f} nodes/s  {new / old:.2f}x")
+
+    old = per_node(lambda: [legacy_text_node_to_html_node(n) for n in split], len(split))
+    new = per_node(lambda: [text_node_to_html_node(n) for n in split], len(split))
+    print(f"to html node       legacy {old:12,.0f} nodes/s  dispatch {new:12,.0f} nodes/s  {new / old:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 from enum import Enum
+import mmap
+import os
 import re
 
+_HEADING_RE = re.compile(r"#{1,6} ")
+LIST_ITEM_RE = re.compile(r"( *)(-|\d+\.) (.*)")
+
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
     HEADING = "heading"
@@ -10,21 +15,161 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 def block_to_block_type(block) -> BlockType:
-    if re.match(r"^#{1,6} ", block):
+    return lines_to_block_type(block.split("\n"))
+
+def lines_to_block_type(lines) -> BlockType:
+    if _HEADING_RE.match(lines[0]):
         return BlockType.HEADING
-    if block.startswith("```") and block.endswith("```"):
+    # parse_blocks keeps a fence open until its closing line or, if there is
+    # none, the end of the input, so an opening fence always makes CODE.
+    if lines[0].startswith("```"):
         return BlockType.CODE
-    lines = block.split("\n")
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
-    is_ordered = True
+    # One scan over the lines, dropping each candidate as soon as a line
+    # rules it out.
+    is_quote = is_unordered = is_ordered = True
     for i, line in enumerate(lines, start=1):
-        prefix = f"{i}. "
-        if not line.startswith(prefix):
+        if is_quote and not line.startswith(">"):
+            is_quote = False
+        if is_unordered and not line.startswith("- "):
+            is_unordered = False
+        if is_ordered and not line.startswith(f"{i}. "):
             is_ordered = False
-            break
-    if is_ordered:
-        return BlockType.ORDERED_LIST
-    return BlockType.PARAGRAPH
\ No newline at end of file
+        if not (is_quote or is_unordered or is_ordered):
+            return _nested_list_type(lines)
+    if is_quote:
+        return BlockType.QUOTE
+    if is_unordered:
+        return BlockType.UNORDERED_LIST
+    return BlockType.ORDERED_LIST
+
+def _nested_list_type(lines):
+    # A list with indented sub-items or continuation lines. Top-level items
+    # must all use the first item's marker kind.
+    if lines[0].startswith("- "):
+        block_type, top_level = BlockType.UNORDERED_LIST, "-"
+    elif lines[0].startswith("1. "):
+        block_type, top_level = BlockType.ORDERED_LIST, "1."
+    else:
+        return BlockType.PARAGRAPH
+    nested = False
+    for line in lines[1:]:
+        if line.startswith(" "):
+            nested = True
+            continue
+        match = LIST_ITEM_RE.match(line)
+        if match is None or (match.group(2) == "-") != (top_level == "-"):
+            return BlockType.PARAGRAPH
+    return block_type if nested else BlockType.PARAGRAPH
+
+def _finish_block(lines):
+    # Same trimming as str.strip() on the joined block.
+    while lines and not lines[-1].strip():
+        lines.pop()
+    lines[-1] = lines[-1].rstrip()
+    return lines_to_block_type(lines), "\n".join(lines)
+
+def parse_blocks(lines):
+    lines_in_block = []
+    in_fence = False
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        if not lines_in_block:
+            line = line.lstrip()
+            if not line:
+                continue
+            lines_in_block.append(line)
+            stripped = line.rstrip()
+            in_fence = stripped.startswith("```") and not (len(stripped) >= 6 and stripped.endswith("```"))
+            continue
+        if in_fence:
+            lines_in_block.append(line)
+            in_fence = not line.rstrip().endswith("```")
+            continue
+        if not line:
+            yield _finish_block(lines_in_block)
+            lines_in_block = []
+            continue
+        lines_in_block.append(line)
+    if lines_in_block:
+        yield _finish_block(lines_in_block)
+
+# Files at least this large are memory-mapped instead of read as text.
+MMAP_THRESHOLD = 1 << 20
+# Mapped pages already parsed are handed back to the kernel in steps of
+# this many bytes, so resident memory stays flat through a huge file.
+_RELEASE_BYTES = 64 << 20
+
+def _fence_end(data, pos, size):
+    # Offset of the newline ending the closing fence line, as parse_blocks
+    # would find it: the first line whose rstrip() ends with ```.
+    while pos < size:
+        index = data.find(b"```", pos)
+        if index == -1:
+            return size
+        eol = data.find(b"\n", index)
+        if eol == -1:
+            eol = size
+        line_start = data.rfind(b"\n", pos, index) + 1 or pos
+        if data[line_start:eol].decode("utf-8").rstrip().endswith("```"):
+            return eol
+        pos = eol + 1
+    return size
+
+def _scan_blocks(data):
+    # Block boundaries are found on the raw bytes; only one block at a time
+    # is decoded and handed to parse_blocks, which sees exactly the lines
+    # it would have seen in a full read.
+    size = len(data)
+    pos = released = 0
+    while pos < size:
+        eol = data.find(b"\n", pos)
+        if eol == -1:
+            eol = size
+        first = data[pos:eol].decode("utf-8").lstrip()
+        if not first:
+            pos = eol + 1
+            continue
+        start = pos
+        stripped = first.rstrip()
+        if stripped.startswith("```") and not (len(stripped) >= 6 and stripped.endswith("```")):
+            eol = _fence_end(data, eol + 1, size)
+        end = data.find(b"\n\n", eol) if eol < size else -1
+        if end == -1:
+            end = pos = size
+        else:
+            pos = end + 2
+        yield from parse_blocks(data[start:end].decode("utf-8").split("\n"))
+        if pos - released >= _RELEASE_BYTES and pos < size:
+            boundary = pos - pos % mmap.PAGESIZE
+            data.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+            released = boundary
+
+def _has_carriage_return(data):
+    for offset in range(0, len(data), _RELEASE_BYTES):
+        found = data.find(b"\r", offset, offset + _RELEASE_BYTES) != -1
+        data.madvise(mmap.MADV_DONTNEED, offset, min(_RELEASE_BYTES, len(data) - offset))
+        if found:
+            return True
+    return False
+
+def map_blocks(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if not _has_carriage_return(data):
+                yield from _scan_blocks(data)
+                return
+    # Text mode turns "\r\n" and lone "\r" into line breaks; leave those
+    # files to it.
+    yield from _stream_blocks(path)
+
+def _stream_blocks(path):
+    with open(path, encoding="utf-8") as f:
+        yield from parse_blocks(f)
+
+def read_blocks(path):
+    if os.path.getsize(path) >= MMAP_THRESHOLD:
+        return map_blocks(path)
+    return _stream_blocks(path)
@@ -0,0 +1,738 @@
+from collections import deque
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from assets import asset_url, file_hash, sync_assets
+from blocktype import MMAP_THRESHOLD, BlockType, read_blocks
+from functions import (
+    asset_map,
+    asset_src,
+    block_to_html_node,
+    enable_inline_cache,
+    extract_title,
+    heading_to_html_node,
+    inline_cache,
+    render_cache,
+    set_asset_urls,
+    set_inline_cache,
+    set_page_url,
+    set_render_cache,
+    set_text_collector,
+)
+from headings import HeadingIndex
+from htmlnode import escape
+from links import find_broken_links, is_internal, locate, page_links
+from lrucache import LRUCache
+from manifest import content_hash, load_manifest, save_manifest
+import profiling
+from publish import load_redirects, update_redirects, write_feed, write_redirects, write_sitemap
+from search import (
+    add_terms,
+    load_search_index,
+    merge_postings,
+    page_terms,
+    remap_postings,
+    search_index_files,
+    stale_search_files,
+)
+from template import load_template
+from writer import AtomicFile, OutputWriter, remove_output, write_if_changed
+
+
+def find_markdown_files(content_dir):
+    pages = []
+    for root, _, files in os.walk(content_dir):
+        for name in files:
+            if name.endswith(".md"):
+                path = os.path.join(root, name)
+                pages.append(os.path.relpath(path, content_dir))
+    return sorted(pages)
+
+
+def shard_of(page, shards):
+    # A stable hash of the path, not hash(): that is salted per process and
+    # every runner must agree on where each page goes.
+    digest = hashlib.sha256(page.replace(os.sep, "/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def shard_pages(pages, shard, shards):
+    return [page for page in pages if shard_of(page, shards) == shard]
+
+
+def output_path(page):
+    return os.path.splitext(page)[0] + ".html"
+
+
+class RenderOptions:
+    def __init__(self, template=None, headings=False, toc=False, search=False, links=False):
+        self.template = template
+        self.headings = headings or toc
+        self.toc = toc
+        self.search = search
+        self.links = links
+
+    def key(self):
+        # Everything here changes page output, so it is part of each page's
+        # manifest entry. Search and link checking only add side outputs and
+        # are left out.
+        template_hash = None
+        if self.template is not None:
+            with open(self.template, "rb") as f:
+                template_hash = content_hash(f.read())
+        return {"template": template_hash, "headings": self.headings, "toc": self.toc}
+
+
+def render_hash(options, asset_urls):
+    # Only whether assets are hashed goes in the key: which hashed names a
+    # page uses is recorded per page (see stale_assets), so a changed asset
+    # re-renders just the pages that show it.
+    render_key = options.key()
+    render_key["assets"] = bool(asset_urls)
+    return content_hash(json.dumps(render_key, sort_keys=True).encode())
+
+
+def stale_assets(meta, asset_urls, url):
+    # Whether any image on the page would now get another src than the one
+    # it was rendered with.
+    return any(asset_src(src, asset_urls, url) != rendered for src, rendered in meta.get("assets", {}).items())
+
+
+def write_blocks(blocks, options, out, text=None, toc=None):
+    # Writes the page body to out one block at a time, so neither the
+    # blocks, the node tree nor the page's HTML is ever held whole.
+    headings = HeadingIndex() if options.headings else None
+    out.write("<div>")
+    if toc is not None:
+        toc.write_html(out)
+    title = write_body(blocks, out, text, headings)
+    out.write("</div>")
+    return page_meta(title, headings)
+
+
+def write_body(blocks, out, text=None, headings=None):
+    # The blocks' HTML without the surrounding <div>. Returns the title,
+    # picked up from the first "# " heading on the way past.
+    title = None
+    if text is not None:
+        previous = set_text_collector(text)
+    try:
+        for block_type, block in blocks:
+            if title is None and block_type == BlockType.HEADING and block.startswith("# "):
+                title = extract_title([(block_type, block)])
+            block_to_html_node(block, block_type, headings).write_html(out)
+    finally:
+        if text is not None:
+            set_text_collector(previous)
+    return title
+
+
+def page_meta(title, headings):
+    meta = {"title": title}
+    if headings is not None:
+        meta["headings"] = headings.headings
+    return meta
+
+
+def page_toc(blocks):
+    headings = HeadingIndex()
+    previous = set_text_collector(None)
+    try:
+        for block_type, block in blocks:
+            if block_type == BlockType.HEADING:
+                heading_to_html_node(block, headings)
+    finally:
+        set_text_collector(previous)
+    return headings.toc_node()
+
+
+def render_to(path, blocks, options, out, text=None, url=None, streamed=False):
+    # blocks() returns a fresh iterable of (type, block) pairs on each call.
+    # url is the page's site URL, which relative image srcs resolve against.
+    # streamed pages are too large to hold any part of in memory.
+    previous_url = set_page_url(url)
+    try:
+        return _render_to(path, blocks, options, out, text, streamed)
+    except ValueError as e:
+        # Parse errors name the text, not the file it came from.
+        raise ValueError(f"{path}: {e}") from e
+    finally:
+        set_page_url(previous_url)
+
+
+def _render_to(path, blocks, options, out, text, streamed):
+    if options.template is None and not options.toc:
+        return write_blocks(blocks(), options, out, text)
+    # The table of contents and a layout's title come before the body but
+    # depend on its headings.
+    if streamed:
+        # They get passes over the blocks of their own.
+        toc = page_toc(blocks()) if options.toc else None
+        meta = {"title": extract_title(blocks()) if options.template is not None else None}
+
+        def content(fileobj):
+            meta.update(write_blocks(blocks(), options, fileobj, text, toc))
+    else:
+        # The body is rendered first and they are built from what it found.
+        headings = HeadingIndex() if options.headings else None
+        body = io.StringIO()
+        meta = page_meta(write_body(blocks(), body, text, headings), headings)
+        toc = headings.toc_node() if options.toc else None
+
+        def content(fileobj):
+            fileobj.write("<div>")
+            if toc is not None:
+                toc.write_html(fileobj)
+            fileobj.write(body.getvalue())
+            fileobj.write("</div>")
+
+    if options.template is None:
+        content(out)
+        return meta
+    page_title = meta["title"] or os.path.splitext(os.path.basename(path))[0]
+    # The title is plain text; only the content is already HTML.
+    load_template(options.template).write(out, Title=escape(page_title), Content=content)
+    return meta
+
+
+def render_page(path, options=None, text=None, out=None, url=None):
+    # Returns (html, meta), or writes the page to out and returns (None, meta).
+    options = options or RenderOptions()
+    if out is not None:
+        # Re-read for every pass rather than kept: the source may be huge.
+        return None, render_to(path, lambda: read_blocks(path), options, out, text, url, streamed=True)
+    blocks = list(read_blocks(path))
+    buffer = io.StringIO()
+    meta = render_to(path, lambda: blocks, options, buffer, text, url)
+    return buffer.getvalue(), meta
+
+
+def timed_blocks(blocks, profile):
+    # Times pulling each block from the source: splitting, with
+    # classification nested inside.
+    blocks = iter(blocks)
+    while True:
+        start = time.perf_counter()
+        block = next(blocks, None)
+        profile.add("split", time.perf_counter() - start, 0 if block is None else 1)
+        if block is None:
+            return
+        yield block
+
+
+def profile_page(path, options=None, text=None, out=None, url=None):
+    options = options or RenderOptions()
+    html = None
+    with profiling.page(path) as profile:
+        start = time.perf_counter()
+        if out is None:
+            blocks = list(read_blocks(path))
+            profile.add("split", time.perf_counter() - start, len(blocks))
+            buffer = io.StringIO()
+            meta = render_to(path, lambda: blocks, options, buffer, text, url)
+            html = buffer.getvalue()
+            profile.bytes = len(html.encode("utf-8"))
+        else:
+            meta = render_to(path, lambda: timed_blocks(read_blocks(path), profile), options, out, text, url,
+                             streamed=True)
+        elapsed = time.perf_counter() - start
+        # read_blocks classifies as it splits; keep the two stages apart.
+        profile.seconds["split"] -= profile.seconds["classify"]
+        # Everything the hooks did not time is tree building and
+        # serialization.
+        profile.add("html", elapsed - sum(profile.seconds.values()))
+    return html, meta, profile
+
+
+def cache_counters(cache):
+    return cache.counters() if cache is not None else {}
+
+
+def counter_delta(before, after):
+    return {key: after[key] - before.get(key, 0) for key in after if key != "size"}
+
+
+class PageText:
+    # Text collector for one page. TextNodes are folded into the page's
+    # search terms and links every BATCH nodes, so a long page's nodes are
+    # never all kept at once.
+    BATCH = 4096
+
+    def __init__(self, search=False, links=False, images=False):
+        self.search = search
+        self.links = links
+        self.images = images
+        self._terms = set()
+        self._links = {}
+        self._images = {}
+        self._nodes = []
+
+    def extend(self, nodes):
+        self._nodes.extend(nodes)
+        if len(self._nodes) >= self.BATCH:
+            self._fold()
+
+    def _fold(self):
+        if self.search:
+            self._terms.update(page_terms(self._nodes))
+        if self.links or self.images:
+            found = page_links(self._nodes)
+            self._links.update(dict.fromkeys(found["links"]))
+            self._images.update(dict.fromkeys(found["images"]))
+        self._nodes = []
+
+    def terms(self):
+        self._fold()
+        return self._terms
+
+    def page_links(self):
+        self._fold()
+        return {"links": list(self._links), "images": list(self._images)}
+
+
+class RenderedPages:
+    def __init__(self):
+        # None for pages the worker already wrote to their output file.
+        self.html = []
+        self.meta = []
+        self.written = 0
+        self.skipped = 0
+        self.inline_cache = {}
+        self.render_cache = {}
+        self.profiles = []
+        # Partial inverted index: term -> indexes into self.meta.
+        self.search = {}
+
+    def extend(self, other):
+        merge_postings(self.search, other.search, len(self.meta))
+        self.html.extend(other.html)
+        self.meta.extend(other.meta)
+        self.written += other.written
+        self.skipped += other.skipped
+        for key, value in other.inline_cache.items():
+            self.inline_cache[key] = self.inline_cache.get(key, 0) + value
+        for key, value in other.render_cache.items():
+            self.render_cache[key] = self.render_cache.get(key, 0) + value
+        self.profiles.extend(other.profiles)
+
+
+# Sources at least this large are written straight to their output file by
+# the process rendering them instead of travelling back as one string.
+STREAM_THRESHOLD = MMAP_THRESHOLD
+
+
+def render_chunk(jobs, profile=False, options=None):
+    # jobs are (source, output, url) triples; output may be None to always
+    # get the HTML back, url None when the page's site URL is unknown.
+    rendered = RenderedPages()
+    search = options is not None and options.search
+    links = options is not None and options.links
+    asset_urls = asset_map()
+    inline_before = cache_counters(inline_cache())
+    render_before = cache_counters(render_cache())
+    for path, output, url in jobs:
+        text = PageText(search, links, bool(asset_urls)) if search or links or asset_urls else None
+        out = None
+        if output is not None and os.path.getsize(path) >= STREAM_THRESHOLD:
+            out = AtomicFile(output)
+        try:
+            if profile:
+                html, meta, page_profile = profile_page(path, options, text, out, url)
+                rendered.profiles.append(page_profile)
+            else:
+                html, meta = render_page(path, options, text, out, url)
+        except BaseException:
+            if out is not None:
+                out.discard()
+            raise
+        if out is not None:
+            if out.commit():
+                rendered.written += 1
+            else:
+                rendered.skipped += 1
+            if profile:
+                page_profile.bytes = os.path.getsize(output)
+        if search:
+            # Each worker indexes its own chunk; only the compact term ->
+            # page lists travel back, not the page text.
+            add_terms(rendered.search, len(rendered.html), text.terms())
+        if asset_urls:
+            meta["assets"] = {src: asset_src(src, asset_urls, url)
+                              for src in text.page_links()["images"] if is_internal(src)}
+        if links:
+            meta.update(text.page_links())
+        rendered.html.append(html)
+        rendered.meta.append(meta)
+    rendered.inline_cache = counter_delta(inline_before, cache_counters(inline_cache()))
+    rendered.render_cache = counter_delta(render_before, cache_counters(render_cache()))
+    return rendered
+
+
+def init_worker(inline_cache_size, profile, asset_urls, render_cache_size=0):
+    enable_inline_cache(inline_cache_size)
+    set_render_cache(LRUCache(render_cache_size) if render_cache_size > 0 else None)
+    set_asset_urls(asset_urls)
+    if profile:
+        profiling.install()
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# Upper bound on pages per chunk: every rendered chunk is held whole until
+# its pages are handed to the writer.
+MAX_CHUNK_PAGES = 64
+
+
+def bounded_map(executor, func, items, limit):
+    # Executor.map submits every item up front, and finished results pile
+    # up however slowly they are consumed. This keeps at most limit tasks
+    # in flight, so a consumer blocked on the disk also holds back the
+    # workers. Results come back in input order.
+    pending = deque()
+    for item in items:
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_pages(paths, workers=None, inline_cache_size=0, profile=False, options=None, asset_urls=None,
+                 render_cache_size=0, outputs=None, urls=None):
+    # Yields RenderedPages for consecutive chunks of paths, in order, so
+    # callers can write each chunk out before the next one arrives. With
+    # outputs, large pages are written there directly; urls are the pages'
+    # site URLs.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    jobs = list(zip(paths, outputs or [None] * len(paths), urls or [None] * len(paths)))
+    chunksize = max(1, min(MAX_CHUNK_PAGES, len(paths) // (workers * 8)))
+    if workers <= 1 or len(paths) <= 1:
+        previous_cache = set_inline_cache(LRUCache(inline_cache_size) if inline_cache_size > 0 else None)
+        previous_urls = set_asset_urls(asset_urls)
+        previous_render = set_render_cache(LRUCache(render_cache_size) if render_cache_size > 0 else None)
+        if profile:
+            profiling.install()
+        try:
+            for chunk in chunked(jobs, chunksize):
+                yield render_chunk(chunk, profile, options)
+        finally:
+            profiling.uninstall()
+            set_render_cache(previous_render)
+            set_asset_urls(previous_urls)
+            set_inline_cache(previous_cache)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(inline_cache_size, profile, asset_urls, render_cache_size)) as executor:
+        render = partial(render_chunk, profile=profile, options=options)
+        yield from bounded_map(executor, render, chunked(jobs, chunksize), workers * 2)
+
+
+HEADINGS_INDEX_NAME = "headings.json"
+
+
+def heading_index_json(entries):
+    index = {}
+    for page in sorted(entries):
+        entry = entries[page]
+        index[page_url(entry["output"])] = entry["meta"].get("headings", [])
+    return json.dumps(index, indent=1, sort_keys=True, ensure_ascii=False)
+
+
+def page_url(output):
+    return "/" + output.replace(os.sep, "/")
+
+
+def search_postings(pages, entries, stale, rendered, previous_docs, previous_postings):
+    # Documents are numbered in page order. Unchanged pages keep their
+    # postings from the previous index; re-rendered pages bring their own.
+    ids = {page_url(entries[page]["output"]): doc for doc, page in enumerate(pages)}
+    stale_urls = {page_url(entries[page]["output"]) for page in stale}
+    carried = {old: ids[url] for old, url in enumerate(previous_docs) if url in ids and url not in stale_urls}
+    postings = remap_postings(previous_postings, carried)
+    fresh = {index: ids[page_url(entries[page]["output"])] for index, page in enumerate(stale)}
+    merge_postings(postings, remap_postings(rendered.search, fresh))
+    return postings
+
+
+def check_links(content_dir, entries, assets=None, generated=()):
+    targets = {page_url(entry["output"]) for entry in entries.values()}
+    targets.update(page_url(name) for name in generated)
+    rewritten = ()
+    if assets is not None and assets.urls:
+        # Hashed: only the hashed names are published, and only image
+        # sources are rewritten to them.
+        targets.update(assets.urls.values())
+        rewritten = assets.urls
+    elif assets is not None:
+        targets.update(asset_url(asset) for asset in assets.copied + assets.skipped)
+    anchors = {page_url(entry["output"]): {heading["slug"] for heading in entry["meta"]["headings"]}
+               for entry in entries.values() if "headings" in entry["meta"]}
+    graph = {page: (page_url(entry["output"]), entry["meta"]) for page, entry in entries.items()}
+    broken = find_broken_links(graph, targets, anchors, rewritten)
+    by_page = {}
+    for link in broken:
+        by_page.setdefault(link.page, []).append(link)
+    for page, links in by_page.items():
+        with open(os.path.join(content_dir, page), encoding="utf-8") as f:
+            locate(f.read(), links)
+    return broken
+
+
+def page_title(page, entry):
+    return entry["meta"].get("title") or os.path.splitext(os.path.basename(page))[0]
+
+
+def moved_pages(previous, removed, entries):
+    # A removed page whose exact source reappears under a new path was
+    # moved; its old URL should redirect to the new one.
+    added = {entry["hash"]: page for page, entry in entries.items() if page not in previous}
+    moved = {}
+    for page in removed:
+        target = added.get(previous[page]["hash"])
+        if target is not None:
+            moved[page_url(previous[page]["output"])] = page_url(entries[target]["output"])
+    return moved
+
+
+def publish_files(content_dir, public_dir, pages, entries, base_url=None, feed_size=20, moved=None):
+    # Generators, not lists: the writers stream entries to disk one at a
+    # time, and only the feed keeps its newest feed_size pages around.
+    def mtime(page):
+        return os.stat(os.path.join(content_dir, page)).st_mtime
+
+    files = []
+    if base_url is not None:
+        files += write_sitemap(public_dir, base_url,
+                               ((page_url(entries[page]["output"]), mtime(page)) for page in pages))
+        if feed_size > 0:
+            index = entries.get("index.md")
+            title = index["meta"].get("title") if index else None
+            files += write_feed(public_dir, base_url, title or base_url,
+                                ((page_url(entries[page]["output"]), page_title(page, entries[page]), mtime(page))
+                                 for page in pages), feed_size)
+    if moved is not None:
+        urls = {page_url(entry["output"]) for entry in entries.values()}
+        files += write_redirects(public_dir, update_redirects(load_redirects(public_dir), moved, urls))
+    return files
+
+
+def write_site_files(writer, public_dir, pages, entries, headings=False, postings=None):
+    # Files derived from every page's manifest entry rather than from one page.
+    generated = []
+    if headings:
+        writer.submit(os.path.join(public_dir, HEADINGS_INDEX_NAME), heading_index_json(entries))
+        generated.append(HEADINGS_INDEX_NAME)
+    if postings is not None:
+        docs = [{"url": page_url(entries[page]["output"]), "title": entries[page]["meta"].get("title")}
+                for page in pages]
+        files = search_index_files(docs, postings)
+        for name, data in files.items():
+            writer.submit(os.path.join(public_dir, name), data)
+        generated.extend(files)
+    return generated
+
+
+def finish_site(content_dir, public_dir, pages, entries, previous, removed, generated, assets=None, search=False,
+                links=False, base_url=None, feed_size=20, redirects=False):
+    # Runs once the pages and site-wide files are written; returns broken
+    # links, or None when links are not checked.
+    if search:
+        # Search files whose prefix no longer has any terms, removed only
+        # once the new index is in place.
+        for name in stale_search_files(public_dir, generated):
+            remove_output(public_dir, name)
+
+    moved = moved_pages(previous, removed, entries) if redirects else None
+    generated = generated + publish_files(content_dir, public_dir, pages, entries, base_url, feed_size, moved)
+
+    broken = check_links(content_dir, entries, assets, generated) if links else None
+
+    save_manifest(public_dir, entries)
+    return broken
+
+
+def write_page(path, html):
+    return write_if_changed(path, html.encode("utf-8"))
+
+
+class BuildResult:
+    def __init__(self, pages, rendered, removed, inline_cache=None, profiles=None, written=0, skipped=0,
+                 assets=None, search_terms=None, broken_links=None, render_cache=None):
+        self.pages = pages
+        self.rendered = rendered
+        self.removed = removed
+        self.written = written
+        self.skipped = skipped
+        self.assets = assets
+        self.search_terms = search_terms
+        self.broken_links = broken_links
+        self.inline_cache = inline_cache or {}
+        self.render_cache = render_cache or {}
+        self.profiles = profiles or []
+
+    def __repr__(self):
+        return f"BuildResult({len(self.pages)} pages, {len(self.rendered)} rendered, {len(self.removed)} removed)"
+
+
+def build_site(content_dir, public_dir, workers=None, force=False, inline_cache_size=0, profile=False,
+               template=None, static_dir=None, hash_assets=False, headings=False, toc=False,
+               search=False, links=False, render_cache_size=0, base_url=None, feed_size=20, redirects=False,
+               shard=None):
+    # shard is an (index, count) pair: render only the pages that hash to
+    # that shard, leaving the site-wide files to merge_shards.
+    if not os.path.isdir(content_dir):
+        raise FileNotFoundError(f"Content directory not found: {content_dir}")
+    assets = None
+    asset_urls = {}
+    if static_dir is not None:
+        assets = sync_assets(static_dir, public_dir, hashed=hash_assets)
+        asset_urls = assets.urls
+    options = RenderOptions(template, headings, toc, search, links)
+    page_render = render_hash(options, asset_urls)
+    pages = find_markdown_files(content_dir)
+    if shard is not None:
+        pages = shard_pages(pages, *shard)
+    previous = {} if force else load_manifest(public_dir)
+    previous_docs, previous_postings = [], {}
+    if search and not force:
+        previous_docs, previous_postings = load_search_index(public_dir)
+    indexed = set(previous_docs)
+
+    entries = {}
+    stale = []
+    for page in pages:
+        # Hashed in chunks: a source can be far larger than we want in memory.
+        entry = {"hash": file_hash(os.path.join(content_dir, page)), "output": output_path(page),
+                 "render": page_render}
+        entries[page] = entry
+        old = previous.get(page)
+        if (old is None or any(old.get(key) != value for key, value in entry.items())
+                or not os.path.exists(os.path.join(public_dir, entry["output"]))
+                or stale_assets(old.get("meta", {}), asset_urls, page_url(entry["output"]))
+                or (search and page_url(entry["output"]) not in indexed)
+                or (links and "links" not in old.get("meta", {}))):
+            stale.append(page)
+        else:
+            entry["meta"] = old.get("meta", {})
+
+    removed = sorted(page for page in previous if page not in entries)
+    for page in removed:
+        remove_output(public_dir, previous[page]["output"])
+
+    sources = [os.path.join(content_dir, page) for page in stale]
+    outputs = [os.path.join(public_dir, entries[page]["output"]) for page in stale]
+    urls = [page_url(entries[page]["output"]) for page in stale]
+    rendered = RenderedPages()
+    search_terms = None
+    postings = None
+    with OutputWriter() as writer:
+        # Pages go to the writer chunk by chunk as they are rendered; only
+        # their metadata and search postings are kept.
+        for chunk in render_pages(sources, workers, inline_cache_size, profile, options, asset_urls,
+                                  render_cache_size, outputs, urls):
+            start = len(rendered.meta)
+            for page, html, meta in zip(stale[start:], chunk.html, chunk.meta):
+                entries[page]["meta"] = meta
+                if html is not None:
+                    writer.submit(os.path.join(public_dir, entries[page]["output"]), html)
+            chunk.html = []
+            rendered.extend(chunk)
+        if search:
+            postings = search_postings(pages, entries, stale, rendered, previous_docs, previous_postings)
+            search_terms = len(postings)
+        # A shard keeps its own search index, which merge_shards reads back,
+        # but headings.json and the rest only make sense for the whole site.
+        generated = write_site_files(writer, public_dir, pages, entries, options.headings and shard is None,
+                                     postings)
+
+    if shard is not None:
+        if search:
+            for name in stale_search_files(public_dir, generated):
+                remove_output(public_dir, name)
+        save_manifest(public_dir, entries)
+        broken = None
+    else:
+        broken = finish_site(content_dir, public_dir, pages, entries, previous, removed, generated, assets,
+                             search, links, base_url, feed_size, redirects)
+    return BuildResult(pages, stale, removed, rendered.inline_cache, rendered.profiles,
+                       writer.written + rendered.written, writer.skipped + rendered.skipped, assets, search_terms,
+                       broken, rendered.render_cache)
+
+
+def merge_shards(content_dir, shard_dirs, public_dir, template=None, static_dir=None, hash_assets=False,
+                 headings=False, toc=False, search=False, links=False, base_url=None, feed_size=20,
+                 redirects=False):
+    # shard_dirs[i] holds the output of build_site(..., shard=(i, len(shard_dirs)))
+    # run with the same options. Pages are copied over and the site-wide
+    # files rebuilt from the shard manifests, giving the same public/ tree
+    # as an unsharded build.
+    if not os.path.isdir(content_dir):
+        raise FileNotFoundError(f"Content directory not found: {content_dir}")
+    if not shard_dirs:
+        raise ValueError("No shards to merge")
+    assets = None
+    asset_urls = {}
+    if static_dir is not None:
+        assets = sync_assets(static_dir, public_dir, hashed=hash_assets)
+        asset_urls = assets.urls
+    page_render = render_hash(RenderOptions(template, headings, toc, search, links), asset_urls)
+    pages = find_markdown_files(content_dir)
+    previous = load_manifest(public_dir)
+    shards = len(shard_dirs)
+
+    entries = {}
+    sources = {}
+    postings = {} if search else None
+    ids = {page_url(output_path(page)): doc for doc, page in enumerate(pages)}
+    for shard, shard_dir in enumerate(shard_dirs):
+        manifest = load_manifest(shard_dir)
+        expected = shard_pages(pages, shard, shards)
+        for page in expected:
+            entry = manifest.get(page)
+            # A shard built from other sources, with other options or by
+            # another generator version would silently mix two sites.
+            if (entry is None or entry["render"] != page_render
+                    or entry["hash"] != file_hash(os.path.join(content_dir, page))
+                    or stale_assets(entry["meta"], asset_urls, page_url(entry["output"]))):
+                raise ValueError(f"Shard {shard} ({shard_dir}) is out of date for {page}")
+            if links and "links" not in entry["meta"]:
+                raise ValueError(f"Shard {shard} ({shard_dir}) was built without link checking")
+            entries[page] = entry
+            sources[page] = shard_dir
+        if search:
+            urls, shard_postings = load_search_index(shard_dir)
+            if not {page_url(entries[page]["output"]) for page in expected} <= set(urls):
+                raise ValueError(f"Shard {shard} ({shard_dir}) was built without a search index")
+            carried = {doc: ids[url] for doc, url in enumerate(urls) if url in ids}
+            merge_postings(postings, remap_postings(shard_postings, carried))
+
+    removed = sorted(page for page in previous if page not in entries)
+    for page in removed:
+        remove_output(public_dir, previous[page]["output"])
+
+    copied = []
+    with OutputWriter() as writer:
+        for page in pages:
+            entry = entries[page]
+            old = previous.get(page)
+            target = os.path.join(public_dir, entry["output"])
+            if (old is not None and all(old.get(key) == entry[key] for key in ("hash", "output", "render"))
+                    and old.get("meta", {}).get("assets") == entry["meta"].get("assets")
+                    and os.path.exists(target)):
+                continue
+            writer.copy(os.path.join(sources[page], entry["output"]), target)
+            copied.append(page)
+        generated = write_site_files(writer, public_dir, pages, entries, headings or toc, postings)
+
+    broken = finish_site(content_dir, public_dir, pages, entries, previous, removed, generated, assets,
+                         search, links, base_url, feed_size, redirects)
+    return BuildResult(pages, copied, removed, written=writer.written, skipped=writer.skipped, assets=assets,
+                       search_terms=len(postings) if search else None, broken_links=broken)
@@ -0,0 +1,71 @@
+from blocktype import BlockType, parse_blocks, read_blocks
+from functions import block_to_html_node, extract_title, heading_text, text_to_textnodes
+
+
+class Document:
+    def __init__(self, blocks):
+        # Block boundaries and types are known up front; inline parsing and
+        # HTML rendering happen per block, on first access.
+        self.blocks = list(blocks)
+        self._html = [None] * len(self.blocks)
+
+    @classmethod
+    def from_markdown(cls, markdown):
+        return cls(parse_blocks(markdown.split("\n")))
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(read_blocks(path))
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def __repr__(self):
+        rendered = sum(html is not None for html in self._html)
+        return f"Document({len(self.blocks)} blocks, {rendered} rendered)"
+
+    @property
+    def title(self):
+        return extract_title(self.blocks)
+
+    def block_html(self, index):
+        html = self._html[index]
+        if html is None:
+            block_type, block = self.blocks[index]
+            html = block_to_html_node(block, block_type).to_html()
+            self._html[index] = html
+        return html
+
+    def iter_html(self, start=0, stop=None):
+        yield "<div>"
+        for index in range(*slice(start, stop).indices(len(self.blocks))):
+            yield self.block_html(index)
+        yield "</div>"
+
+    def render(self, start=0, stop=None):
+        return "".join(self.iter_html(start, stop))
+
+    def preview(self, count):
+        return self.render(0, count)
+
+    def headings(self):
+        for index, (block_type, block) in enumerate(self.blocks):
+            if block_type == BlockType.HEADING:
+                level = len(block) - len(block.lstrip("#"))
+                # Plain text, as in the page's heading index and TOC.
+                yield index, level, heading_text(text_to_textnodes(block[level + 1:]))
+
+    def section_range(self, heading):
+        start = None
+        for index, level, text in self.headings():
+            if start is None:
+                if text == heading:
+                    start, start_level = index, level
+            elif level <= start_level:
+                return start, index
+        if start is None:
+            raise KeyError(f"No heading '{heading}' in document")
+        return start, len(self.blocks)
+
+    def section(self, heading):
+        return self.render(*self.section_range(heading))
@@ -1,6 +1,20 @@
 from textnode import TextNode, TextType, LeafNode
+from htmlnode import Markup, ParentNode
+from blocktype import LIST_ITEM_RE, BlockType, block_to_block_type, parse_blocks
+from links import is_internal, resolve
+from lrucache import LRUCache
+import posixpath
 import re
 
+_IMAGE_RE = re.compile(r"!\[([^\]]+)\]\(([^)]+)\)")
+_LINK_RE = re.compile(r"(?<!!)\[([^\]]+)\]\(([^)]+)\)")
+_DELIMITER_RE = re.compile(r"`|\*\*|_")
+_DELIMITER_TYPES = {
+    "`": TextType.CODE,
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+}
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     for node in old_nodes:
         if node.text_type != TextType.TEXT or delimiter not in node.text:
@@ -18,15 +32,14 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
             yield TextNode(part, text_type if i % 2 else TextType.TEXT)
     
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\]]+)\]\(([^)]+)\)", text)
-    return matches
+    return _IMAGE_RE.findall(text)
 
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[([^\]]+)\]\(([^)]+)\)", text)
-    return matches
+    return _LINK_RE.findall(text)
 
-def split_nodes_image(old_nodes):
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    # One finditer pass yields both the captures and the text between them.
     new_nodes = []
 
     for node in old_nodes:
@@ -35,79 +48,313 @@ def split_nodes_image(old_nodes):
             continue
 
         text = node.text
-        matches = extract_markdown_images(text)
+        start = 0
+        for match in pattern.finditer(text):
+            if match.start() > start:
+                new_nodes.append(TextNode(text[start:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            start = match.end()
 
-        if not matches:
+        if start == 0:
             new_nodes.append(node)
-            continue
-
-        parts = re.split(r"!\[[^\]]+\]\([^)]+\)", text)
-
-        for i, part in enumerate(parts):
-            if part:
-                new_nodes.append(TextNode(part, TextType.TEXT))
-            if i < len(matches):
-                alt, url = matches[i]
-                new_nodes.append(TextNode(alt, TextType.IMAGE, url))
+        elif start < len(text):
+            new_nodes.append(TextNode(text[start:], TextType.TEXT))
 
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    return _split_nodes_pattern(old_nodes, _IMAGE_RE, TextType.IMAGE)
+
 def split_nodes_link(old_nodes):
-    new_nodes = []
+    return _split_nodes_pattern(old_nodes, _LINK_RE, TextType.LINK)
 
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            new_nodes.append(node)
-            continue
+def _append_links(text, start, end, nodes):
+    for match in _LINK_RE.finditer(text, start, end):
+        if match.start() > start:
+            nodes.append(TextNode(text[start:match.start()], TextType.TEXT))
+        nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+        start = match.end()
+    if start < end:
+        nodes.append(TextNode(text[start:end], TextType.TEXT))
 
-        text = node.text
-        matches = extract_markdown_links(text)
+def _append_text(text, start, end, nodes):
+    # Images win over links, exactly like running split_nodes_image before
+    # split_nodes_link: links are only looked for between image matches.
+    if text.find("[", start, end) == -1:
+        if start < end:
+            nodes.append(TextNode(text[start:end], TextType.TEXT))
+        return
+    for match in _IMAGE_RE.finditer(text, start, end):
+        _append_links(text, start, match.start(), nodes)
+        nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        start = match.end()
+    _append_links(text, start, end, nodes)
 
-        if not matches:
-            new_nodes.append(node)
+def text_to_textnodes(text):
+    # Single left-to-right scan with the same precedence as the staged
+    # pipeline: code spans hide everything, bold hides italic, and images
+    # and links are only parsed in plain text.
+    if not text:
+        return [TextNode(text, TextType.TEXT)]
+    nodes = []
+    open_type = None
+    open_delimiter = None
+    start = 0
+    for match in _DELIMITER_RE.finditer(text):
+        delimiter = match.group()
+        if open_type is TextType.CODE and delimiter != "`":
             continue
+        if open_type is TextType.BOLD and delimiter == "_":
+            continue
+        if open_type is None:
+            _append_text(text, start, match.start(), nodes)
+            open_type = _DELIMITER_TYPES[delimiter]
+            open_delimiter = delimiter
+        elif delimiter == open_delimiter:
+            if match.start() > start:
+                nodes.append(TextNode(text[start:match.start()], open_type))
+            open_type = None
+        else:
+            raise ValueError(f"Unmatched delimiter '{open_delimiter}' in text: {text}")
+        start = match.end()
+    if open_type is not None:
+        raise ValueError(f"Unmatched delimiter '{open_delimiter}' in text: {text}")
+    _append_text(text, start, len(text), nodes)
+    return nodes
 
-        parts = re.split(r"(?<!!)\[[^\]]+\]\([^)]+\)", text)
 
-        for i, part in enumerate(parts):
-            if part:
-                new_nodes.append(TextNode(part, TextType.TEXT))
-            if i < len(matches):
-                anchor, url = matches[i]
-                new_nodes.append(TextNode(anchor, TextType.LINK, url))
+def markdown_to_blocks(markdown):
+    return [block for _, block in parse_blocks(markdown.split("\n"))]
 
-    return new_nodes
+_asset_urls = {}
+_page_url = None
 
-def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = list(split_nodes_delimiter(nodes, "`", TextType.CODE))
-    nodes = list(split_nodes_delimiter(nodes, "**", TextType.BOLD))
-    nodes = list(split_nodes_delimiter(nodes, "_", TextType.ITALIC))
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    return nodes
+def set_asset_urls(urls):
+    global _asset_urls
+    previous = _asset_urls
+    _asset_urls = urls or {}
+    return previous
 
+def asset_map():
+    return _asset_urls
 
-def markdown_to_blocks(markdown):
-    raw_blocks = markdown.split("\n\n")
-    blocks = []
-    for block in raw_blocks:
-        clean = block.strip()
-        if clean:
-            blocks.append(clean)
-    return blocks
+def set_page_url(url):
+    # The site URL of the page being rendered; relative image srcs are
+    # looked up in the asset map as seen from it.
+    global _page_url
+    previous = _page_url
+    _page_url = url
+    return previous
+
+def asset_src(url, urls, page_url=None):
+    # The src an image is written with: its hashed asset URL when it has
+    # one, resolving a relative src against page_url first.
+    hashed = urls.get(url)
+    if hashed is None and page_url is not None and url[:1] != "/" and is_internal(url):
+        hashed = urls.get(resolve(page_url, url)[0])
+    return hashed or url
+
+def _cache_base():
+    # Relative image srcs render differently per directory once assets are
+    # hashed, so cached HTML is only shared within one directory then.
+    if _asset_urls and _page_url is not None:
+        return posixpath.dirname(_page_url)
+    return None
+
+_HTML_CONVERTERS = {
+    TextType.TEXT: lambda node: LeafNode(None, node.text),
+    TextType.BOLD: lambda node: LeafNode("b", node.text),
+    TextType.ITALIC: lambda node: LeafNode("i", node.text),
+    TextType.CODE: lambda node: LeafNode("code", node.text),
+    TextType.LINK: lambda node: LeafNode("a", node.text, {"href": node.url}),
+    TextType.IMAGE: lambda node: LeafNode("img", "", {"src": asset_src(node.url, _asset_urls, _page_url), "alt": node.text}),
+}
 
 def text_node_to_html_node(text_node):
-        if text_node.text_type == TextType.TEXT:
-            return LeafNode(None, text_node.text)
-        if text_node.text_type == TextType.BOLD:
-            return LeafNode("b", text_node.text)
-        if text_node.text_type == TextType.ITALIC:
-            return LeafNode("i", text_node.text)
-        if text_node.text_type == TextType.CODE:
-            return LeafNode("code", text_node.text)
-        if text_node.text_type == TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
-        if text_node.text_type == TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-        raise ValueError(f"invalid text type: {text_node.text_type}")
\ No newline at end of file
+    convert = _HTML_CONVERTERS.get(text_node.text_type)
+    if convert is None:
+        raise ValueError(f"invalid text type: {text_node.text_type}")
+    return convert(text_node)
+
+_inline_cache = None
+
+def set_inline_cache(cache):
+    global _inline_cache
+    previous = _inline_cache
+    _inline_cache = cache
+    return previous
+
+def enable_inline_cache(maxsize):
+    set_inline_cache(LRUCache(maxsize) if maxsize > 0 else None)
+
+def inline_cache():
+    return _inline_cache
+
+_text_collector = None
+
+def set_text_collector(collector):
+    # A list that receives every TextNode parsed while rendering, so page
+    # level indexes can be built from the same parse as the HTML.
+    global _text_collector
+    previous = _text_collector
+    _text_collector = collector
+    return previous
+
+def render_inline(key):
+    text, _ = key
+    nodes = tuple(text_to_textnodes(text))
+    html = Markup("".join(text_node_to_html_node(node).to_html() for node in nodes))
+    return nodes, html
+
+def text_to_children(text):
+    if _inline_cache is not None:
+        # Cached entries are shared across pages, so hand out the rendered
+        # HTML as a fresh leaf rather than the cached nodes themselves.
+        nodes, html = _inline_cache.get((text, _cache_base()), render_inline)
+        if _text_collector is not None:
+            _text_collector.extend(nodes)
+        return [LeafNode(None, html)]
+    nodes = text_to_textnodes(text)
+    if _text_collector is not None:
+        _text_collector.extend(nodes)
+    return [text_node_to_html_node(node) for node in nodes]
+
+_render_cache = None
+
+def set_render_cache(cache):
+    # Block HTML keyed on (block type, source, _cache_base()): the block's
+    # fingerprint. The same source always builds the same subtree within a
+    # build and directory, so a hit skips inline parsing, node conversion
+    # and serialization at once.
+    global _render_cache
+    previous = _render_cache
+    _render_cache = cache
+    return previous
+
+def render_cache():
+    return _render_cache
+
+def render_block(key):
+    block_type, block, _ = key
+    nodes = []
+    previous = set_text_collector(nodes)
+    try:
+        html = _block_to_html_node(block, block_type).to_html()
+    finally:
+        set_text_collector(previous)
+    return tuple(nodes), Markup(html)
+
+def heading_to_html_node(block, headings=None):
+    level = len(block) - len(block.lstrip("#"))
+    text = block[level + 1:]
+    if headings is None:
+        return ParentNode(f"h{level}", text_to_children(text))
+    # Index the heading from the same inline parse that renders it.
+    nodes = text_to_textnodes(text)
+    if _text_collector is not None:
+        _text_collector.extend(nodes)
+    slug = headings.add(level, heading_text(nodes))
+    children = [text_node_to_html_node(node) for node in nodes]
+    return ParentNode(f"h{level}", children, {"id": slug})
+
+_QUOTE_MARKERS_RE = re.compile(r"(?:> ?)+")
+
+def list_to_html_node(lines):
+    # Items nest by indentation. The stack holds (indent, list node) from
+    # the outermost list inwards, so depth costs neither recursion nor
+    # rescanning; item text is converted once every continuation is in.
+    root = ParentNode("ol" if lines[0][0].isdigit() else "ul", [])
+    stack = [(0, root)]
+    items = []
+    for line in lines:
+        match = LIST_ITEM_RE.match(line)
+        if match is None:
+            items[-1][1].append(line.strip())
+            continue
+        indent = len(match.group(1))
+        dedent = False
+        while len(stack) > 1 and indent < stack[-1][0]:
+            stack.pop()
+            dedent = True
+        level, list_node = stack[-1]
+        # Only a step in opens a list; stepping back out to an indent no
+        # list was opened at joins the nearest list outside it instead.
+        if indent > level and list_node.children and not dedent:
+            nested = ParentNode("ul" if match.group(2) == "-" else "ol", [])
+            list_node.children[-1].children.append(nested)
+            stack.append((indent, nested))
+            list_node = nested
+        item = ParentNode("li", [])
+        list_node.children.append(item)
+        items.append((item, [match.group(3)]))
+    for item, parts in items:
+        item.children[:0] = text_to_children(" ".join(parts))
+    return root
+
+def quote_to_html_node(lines):
+    # Each ">" is one level; consecutive lines at the same level share a
+    # run of inline text.
+    root = ParentNode("blockquote", [])
+    stack = [root]
+    run = []
+    for line in lines:
+        markers = _QUOTE_MARKERS_RE.match(line).group()
+        depth = markers.count(">")
+        if depth != len(stack):
+            if run:
+                stack[-1].children.extend(text_to_children(" ".join(run)))
+                run = []
+            del stack[depth:]
+            while len(stack) < depth:
+                nested = ParentNode("blockquote", [])
+                stack[-1].children.append(nested)
+                stack.append(nested)
+        run.append(line[len(markers):].strip())
+    stack[-1].children.extend(text_to_children(" ".join(run)))
+    return root
+
+def block_to_html_node(block, block_type=None, headings=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    # Heading ids depend on the page's other headings, so those blocks are
+    # built fresh whenever ids are assigned.
+    if _render_cache is None or (headings is not None and block_type == BlockType.HEADING):
+        return _block_to_html_node(block, block_type, headings)
+    nodes, html = _render_cache.get((block_type, block, _cache_base()), render_block)
+    if _text_collector is not None:
+        _text_collector.extend(nodes)
+    return LeafNode(None, html)
+
+def _block_to_html_node(block, block_type, headings=None):
+    if block_type == BlockType.HEADING:
+        return heading_to_html_node(block, headings)
+    if block_type == BlockType.CODE:
+        # An unclosed fence runs to the end of the input.
+        closed = len(block) >= 6 and block.endswith("```")
+        code = block[3:-3] if closed else block[3:]
+        if code.startswith("\n"):
+            code = code[1:]
+        return ParentNode("pre", [LeafNode("code", code)])
+    lines = block.split("\n")
+    if block_type == BlockType.QUOTE:
+        return quote_to_html_node(lines)
+    if block_type == BlockType.UNORDERED_LIST or block_type == BlockType.ORDERED_LIST:
+        return list_to_html_node(lines)
+    return ParentNode("p", text_to_children(" ".join(lines)))
+
+def heading_text(nodes):
+    # Plain text of a heading: inline markup is parsed and dropped.
+    return "".join(node.text for node in nodes).strip()
+
+def extract_title(blocks):
+    for block_type, block in blocks:
+        if block_type == BlockType.HEADING and block.startswith("# "):
+            return heading_text(text_to_textnodes(block[2:]))
+    return None
+
+def blocks_to_html_node(blocks, headings=None):
+    children = [block_to_html_node(block, block_type, headings) for block_type, block in blocks]
+    return ParentNode("div", children)
+
+def markdown_to_html_node(markdown, headings=None):
+    return blocks_to_html_node(parse_blocks(markdown.split("\n")), headings)
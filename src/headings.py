@@ -0,0 +1,53 @@
+import re
+
+from htmlnode import LeafNode, ParentNode
+
+_SLUG_DROP_RE = re.compile(r"[^\w\s-]|_")
+_SLUG_SPACE_RE = re.compile(r"[\s-]+")
+
+
+def slugify(text):
+    return _SLUG_SPACE_RE.sub("-", _SLUG_DROP_RE.sub("", text.lower())).strip("-")
+
+
+class HeadingIndex:
+    def __init__(self):
+        self.headings = []
+        self._used = {}
+
+    def add(self, level, text):
+        base = slugify(text) or "section"
+        slug = base
+        while slug in self._used:
+            self._used[base] += 1
+            slug = f"{base}-{self._used[base]}"
+        self._used.setdefault(base, 0)
+        self._used.setdefault(slug, 0)
+        self.headings.append({"level": level, "text": text, "slug": slug})
+        return slug
+
+    def __len__(self):
+        return len(self.headings)
+
+    def __repr__(self):
+        return f"HeadingIndex({self.headings})"
+
+    def toc_node(self):
+        if not self.headings:
+            return None
+        root = ParentNode("ul", [])
+        # (level, list) pairs from the outermost list inwards; a deeper
+        # heading opens a nested list inside the previous item.
+        stack = [(self.headings[0]["level"], root)]
+        for heading in self.headings:
+            while len(stack) > 1 and heading["level"] < stack[-1][0]:
+                stack.pop()
+            level, items = stack[-1]
+            if heading["level"] > level and items.children:
+                nested = ParentNode("ul", [])
+                items.children[-1].children.append(nested)
+                stack.append((heading["level"], nested))
+                items = nested
+            link = LeafNode("a", heading["text"], {"href": "#" + heading["slug"]})
+            items.children.append(ParentNode("li", [link]))
+        return ParentNode("nav", [root], {"class": "toc"})
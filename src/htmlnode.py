@@ -1,4 +1,31 @@
+class Markup(str):
+    # Text that is already HTML; escape() passes it through unchanged.
+    __slots__ = ()
+
+
+def escape(text):
+    # Most prose has nothing to escape, and three substring checks are much
+    # cheaper than building a new string.
+    if "&" in text or "<" in text or ">" in text:
+        if isinstance(text, Markup):
+            return text
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def escape_attribute(value):
+    if not isinstance(value, str):
+        value = str(value)
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        if isinstance(value, Markup):
+            return value
+        return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    return value
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -7,41 +34,76 @@ class HTMLNode:
 
     def to_html(self):
         raise NotImplementedError("Subclasses must implement to_html()")
+
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_html(self, fileobj):
+        fileobj.writelines(self.iter_html())
     
     def props_to_html(self):
         if not self.props:
             return ""
-        return "".join(f' {key}="{value}"' for key, value in self.props.items())
+        parts = []
+        for key, value in self.props.items():
+            if not isinstance(value, str):
+                value = str(value)
+            # Same check as escape_attribute, inlined for the common case.
+            if "&" in value or "<" in value or ">" in value or '"' in value:
+                value = escape_attribute(value)
+            parts.append(f' {key}="{value}"')
+        return "".join(parts)
 
     def __repr__(self):
          return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, children=None, props=props)
         
     def to_html(self):
-        if self.value == None:
+        value = self.value
+        if value == None:
             raise ValueError("No Value!")
+        if "&" in value or "<" in value or ">" in value:
+            value = escape(value)
         if self.tag == None:
-            return self.value
-        props_str = self.props_to_html()
-        return f"<{self.tag}{props_str}>{self.value}</{self.tag}>"
+            return value
+        props_str = self.props_to_html() if self.props else ""
+        return f"<{self.tag}{props_str}>{value}</{self.tag}>"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, value=None, children=children, props=props)
     
     def to_html(self):
-        if not self.tag:
-            raise ValueError("ParentNode must have a tag.")
-        if not self.children:
-            raise ValueError("ParentNode must have children.")
-
-        props_str = self.props_to_html()
-        inner_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{props_str}>{inner_html}</{self.tag}>"
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # Walk the tree with an explicit stack so deep trees neither hit the
+        # recursion limit nor copy every subtree's HTML once per ancestor.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif isinstance(node, LeafNode):
+                yield node.to_html()
+            elif isinstance(node, ParentNode):
+                if not node.tag:
+                    raise ValueError("ParentNode must have a tag.")
+                if not node.children:
+                    raise ValueError("ParentNode must have children.")
+                yield f"<{node.tag}{node.props_to_html()}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                yield from node.iter_html()
 
     
 
@@ -0,0 +1,108 @@
+import bisect
+import posixpath
+import re
+
+from textnode import TextType
+
+_SCHEME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+
+def page_links(nodes):
+    # The link and image nodes the inline parser produced for one page, in
+    # first-seen order without duplicates.
+    links = {}
+    images = {}
+    for node in nodes:
+        if node.text_type == TextType.LINK:
+            links[node.url] = None
+        elif node.text_type == TextType.IMAGE:
+            images[node.url] = None
+    return {"links": list(links), "images": list(images)}
+
+
+def is_internal(url):
+    return bool(url) and not _SCHEME_RE.match(url) and not url.startswith("//")
+
+
+def resolve(page_url, url):
+    # Site-root path and fragment an internal URL points at, as seen from
+    # the page at page_url.
+    if url[:1] == "/" and url[-1:] != "/" and "#" not in url and "?" not in url and "/." not in url:
+        return url, ""
+    url, _, fragment = url.partition("#")
+    url = url.split("?", 1)[0]
+    if not url:
+        return page_url, fragment
+    if not url.startswith("/"):
+        url = posixpath.join(posixpath.dirname(page_url), url)
+    path = posixpath.normpath(url)
+    if url.endswith("/") and path != "/":
+        path += "/"
+    if path.endswith("/"):
+        path += "index.html"
+    return path, fragment
+
+
+class BrokenLink:
+    def __init__(self, page, kind, url, reason, line=None, column=None):
+        self.page = page
+        self.kind = kind
+        self.url = url
+        self.reason = reason
+        self.line = line
+        self.column = column
+
+    def location(self):
+        if self.line is None:
+            return self.page
+        return f"{self.page}:{self.line}:{self.column}"
+
+    def __repr__(self):
+        return f"BrokenLink({self.location()}, {self.kind} {self.url}: {self.reason})"
+
+
+def find_broken_links(graph, targets, anchors=None, rewritten=()):
+    # graph maps page -> (page url, {"links": [...], "images": [...]});
+    # targets is the set of every URL the build produced, anchors maps page
+    # urls to the heading ids they define. One set lookup per link.
+    # rewritten holds the site paths of images the renderer replaced with
+    # hashed asset names; they point at the hashed file, not at their own
+    # path.
+    anchors = anchors or {}
+    broken = []
+    for page in sorted(graph):
+        page_url, outgoing = graph[page]
+        for kind in ("links", "images"):
+            for url in outgoing.get(kind, []):
+                if not is_internal(url):
+                    continue
+                path, fragment = resolve(page_url, url)
+                if kind == "images" and path in rewritten:
+                    continue
+                if path not in targets and path + "/index.html" not in targets:
+                    broken.append(BrokenLink(page, kind[:-1], url, "missing target"))
+                elif fragment and path in anchors and fragment not in anchors[path]:
+                    broken.append(BrokenLink(page, kind[:-1], url, "missing anchor"))
+    return broken
+
+
+def locate(source, broken):
+    # Only broken links need source positions, so the markdown is searched
+    # for them after the check instead of tracked for every link.
+    line_starts = [0]
+    line_starts.extend(match.end() for match in re.finditer("\n", source))
+    for link in broken:
+        index = source.find("](" + link.url)
+        if index < 0:
+            continue
+        index += 2
+        line = bisect.bisect_right(line_starts, index) - 1
+        link.line = line + 1
+        link.column = index - line_starts[line] + 1
+
+
+def format_broken_links(broken):
+    lines = [f"{len(broken)} broken links:"]
+    for link in broken:
+        lines.append(f"  {link.location()}: {link.kind} {link.url} ({link.reason})")
+    return "\n".join(lines)
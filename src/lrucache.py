@@ -0,0 +1,53 @@
+from collections import OrderedDict
+import threading
+
+
+class LRUCache:
+    def __init__(self, maxsize=1024):
+        if maxsize <= 0:
+            raise ValueError("LRUCache maxsize must be positive.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        # Compute outside the lock; two threads racing on the same key both
+        # compute the same value and the second store is a no-op.
+        value = compute(key)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def counters(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"LRUCache(maxsize={self.maxsize}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
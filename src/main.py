@@ -1,9 +1,144 @@
-from textnode import TextNode, TextType
-print("hello world")
+import argparse
+import os
+import sys
+
+from build import build_site, merge_shards
+from links import format_broken_links
+from profiling import format_report
+from serve import DevServer
+
+
+def shard_arg(value):
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected INDEX/COUNT, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}")
+    return index, count
+
+
+def add_site_arguments(parser):
+    # Options that shape page output or site-wide files; a merge must be
+    # given the same ones its shards were built with.
+    parser.add_argument("--template", help="HTML layout with {{ Title }} and {{ Content }} slots")
+    parser.add_argument("--static", help="directory of assets to sync into public/ (default: static/ if present)")
+    parser.add_argument("--hash-assets", action="store_true",
+                        help="add content hashes to asset filenames and rewrite image URLs to match")
+    parser.add_argument("--headings", action="store_true",
+                        help="add id attributes to headings and write a site-wide headings.json")
+    parser.add_argument("--toc", action="store_true",
+                        help="insert a table of contents at the top of each page (implies --headings)")
+    parser.add_argument("--search", action="store_true",
+                        help="write a sharded search index to search/ in the output directory")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="site URL; writes sitemap.xml (sharded past 50,000 pages) and an Atom feed.xml")
+    parser.add_argument("--feed", type=int, default=20, metavar="N",
+                        help="number of most recently modified pages in feed.xml, 0 for none (default: 20)")
+    parser.add_argument("--redirects", action="store_true",
+                        help="keep a _redirects file mapping URLs of moved pages to their new location")
+    parser.add_argument("--check-links", action="store_true",
+                        help="report internal links and images that point at nothing the build produced")
+
+
+def static_dir(args):
+    if args.static is None and os.path.isdir("static"):
+        return "static"
+    return args.static
+
+
+def print_result(args, result, verb="Rendered"):
+    print(
+        f"{verb} {len(result.rendered)} of {len(result.pages)} pages into {args.public}"
+        f" ({len(result.removed)} removed)"
+    )
+    print(f"Wrote {result.written} files, skipped {result.skipped} unchanged")
+    if result.assets is not None:
+        assets = result.assets
+        print(f"Assets: {len(assets.copied)} copied, {len(assets.skipped)} unchanged, {len(assets.removed)} removed")
+    if result.search_terms is not None:
+        print(f"Search index: {result.search_terms} terms")
+    if result.inline_cache:
+        stats = result.inline_cache
+        print(f"Inline cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+    if result.render_cache:
+        stats = result.render_cache
+        lookups = stats["hits"] + stats["misses"]
+        rate = stats["hits"] / lookups if lookups else 0.0
+        print(f"Render cache: {stats['hits']} hits, {stats['misses']} misses ({rate:.1%} hit rate),"
+              f" {stats['evictions']} evictions")
+    if result.profiles:
+        print(format_report(result.profiles, args.profile))
+    if result.broken_links:
+        print(format_broken_links(result.broken_links))
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="render a content tree to HTML")
+    build.add_argument("content", nargs="?", default="content")
+    build.add_argument("public", nargs="?", default="public")
+    build.add_argument("-j", "--workers", type=int, default=None,
+                       help="number of render processes (default: CPU count)")
+    build.add_argument("--inline-cache", type=int, default=0, metavar="SIZE",
+                       help="cache rendered inline text, up to SIZE entries per process")
+    build.add_argument("--render-cache", type=int, default=0, metavar="SIZE",
+                       help="reuse the HTML of identical block subtrees, up to SIZE entries per process")
+    build.add_argument("--profile", type=int, nargs="?", const=10, default=None, metavar="N",
+                       help="time each pipeline stage and report the N slowest pages (default: 10)")
+    add_site_arguments(build)
+    build.add_argument("--force", action="store_true",
+                       help="ignore the build manifest and re-render every page")
+    build.add_argument("--shard", type=shard_arg, metavar="INDEX/COUNT",
+                       help="render only the pages that hash to shard INDEX of COUNT; combine shards with merge")
+
+    merge = commands.add_parser("merge", help="combine shard builds into one output directory")
+    merge.add_argument("content")
+    merge.add_argument("public")
+    merge.add_argument("shards", nargs="+", metavar="SHARD",
+                       help="output directories of shards 0, 1, ... in order")
+    add_site_arguments(merge)
+
+    serve = commands.add_parser("serve", help="serve public/ and re-render pages as content changes")
+    serve.add_argument("content", nargs="?", default="content")
+    serve.add_argument("public", nargs="?", default="public")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--template", help="HTML layout with {{ Title }} and {{ Content }} slots")
+
+    args = parser.parse_args(argv)
+    try:
+        run(args)
+    except (OSError, ValueError) as e:
+        # Bad input, not a bug: say what went wrong without a traceback.
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+
+
+def run(args):
+    if args.command == "build":
+        result = build_site(args.content, args.public, workers=args.workers, force=args.force,
+                            inline_cache_size=args.inline_cache, profile=args.profile is not None,
+                            template=args.template, static_dir=static_dir(args), hash_assets=args.hash_assets,
+                            headings=args.headings, toc=args.toc, search=args.search,
+                            links=args.check_links,
+                            render_cache_size=args.render_cache, base_url=args.base_url, feed_size=args.feed,
+                            redirects=args.redirects, shard=args.shard)
+        print_result(args, result)
+    elif args.command == "merge":
+        result = merge_shards(args.content, args.shards, args.public, template=args.template,
+                              static_dir=static_dir(args), hash_assets=args.hash_assets, headings=args.headings,
+                              toc=args.toc, search=args.search, links=args.check_links, base_url=args.base_url,
+                              feed_size=args.feed, redirects=args.redirects)
+        print_result(args, result, "Copied")
+    elif args.command == "serve":
+        try:
+            DevServer(args.content, args.public, args.host, args.port, template=args.template).serve_forever()
+        except KeyboardInterrupt:
+            pass
 
-def main():
-    node = TextNode("This is some anchor text", TextType.LINK, "https://www.boot.dev")
-    print(node)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".build-manifest.json"
+
+# Any change to these modules can change rendered output, so their source
+# is folded into the generator version stored in the manifest.
+GENERATOR_MODULES = ("textnode.py", "htmlnode.py", "blocktype.py", "functions.py", "build.py",
+                     "search.py", "links.py", "headings.py", "template.py")
+
+_generator_version = None
+
+
+def generator_version():
+    global _generator_version
+    if _generator_version is None:
+        digest = hashlib.sha256()
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in GENERATOR_MODULES:
+            with open(os.path.join(src_dir, name), "rb") as f:
+                digest.update(name.encode())
+                digest.update(f.read())
+        _generator_version = digest.hexdigest()
+    return _generator_version
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def manifest_path(public_dir):
+    return os.path.join(public_dir, MANIFEST_NAME)
+
+
+def load_manifest(public_dir):
+    try:
+        with open(manifest_path(public_dir), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get("version") != generator_version():
+        return {}
+    return manifest.get("pages", {})
+
+
+def save_manifest(public_dir, pages):
+    path = manifest_path(public_dir)
+    tmp_path = path + ".tmp"
+    os.makedirs(public_dir, exist_ok=True)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": generator_version(), "pages": pages}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
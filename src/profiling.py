@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+import time
+
+import blocktype
+import functions
+
+STAGES = ("split", "classify", "inline", "convert", "html")
+
+# (module, function name, stage, count returned nodes)
+_HOOKS = (
+    (blocktype, "lines_to_block_type", "classify", False),
+    (functions, "text_to_textnodes", "inline", True),
+    (functions, "text_node_to_html_node", "convert", False),
+)
+
+_originals = {}
+_current = None
+
+
+class PageProfile:
+    def __init__(self, page):
+        self.page = page
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.calls = dict.fromkeys(STAGES, 0)
+        self.nodes = 0
+        self.bytes = 0
+
+    def add(self, stage, seconds, calls=1):
+        self.seconds[stage] += seconds
+        self.calls[stage] += calls
+
+    def total(self):
+        return sum(self.seconds.values())
+
+    def __repr__(self):
+        return f"PageProfile({self.page}, {self.total() * 1000:.3f} ms, {self.nodes} nodes, {self.bytes} bytes)"
+
+
+def _timed(func, stage, count_nodes):
+    def wrapper(*args, **kwargs):
+        profile = _current
+        if profile is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        profile.add(stage, time.perf_counter() - start)
+        if count_nodes:
+            profile.nodes += len(result)
+        return result
+    return wrapper
+
+
+def install():
+    # The stage functions are only wrapped while profiling is on, so a
+    # normal build runs the original functions untouched.
+    for module, name, stage, count_nodes in _HOOKS:
+        key = (module.__name__, name)
+        if key not in _originals:
+            _originals[key] = getattr(module, name)
+            setattr(module, name, _timed(_originals[key], stage, count_nodes))
+
+
+def uninstall():
+    for module, name, _, _ in _HOOKS:
+        original = _originals.pop((module.__name__, name), None)
+        if original is not None:
+            setattr(module, name, original)
+
+
+@contextmanager
+def page(name):
+    global _current
+    profile = PageProfile(name)
+    _current = profile
+    try:
+        yield profile
+    finally:
+        _current = None
+
+
+def aggregate(profiles):
+    total = PageProfile("(all pages)")
+    for profile in profiles:
+        for stage in STAGES:
+            total.add(stage, profile.seconds[stage], profile.calls[stage])
+        total.nodes += profile.nodes
+        total.bytes += profile.bytes
+    return total
+
+
+def format_report(profiles, slowest=10):
+    total = aggregate(profiles)
+    lines = [f"{'stage':<10} {'calls':>10} {'seconds':>10} {'share':>7}"]
+    for stage in STAGES:
+        share = total.seconds[stage] / total.total() if total.total() else 0
+        lines.append(f"{stage:<10} {total.calls[stage]:>10} {total.seconds[stage]:>10.3f} {share:>7.1%}")
+    lines.append(f"{len(profiles)} pages, {total.nodes} text nodes, {total.bytes} bytes of HTML")
+    if slowest:
+        lines.append(f"Slowest {min(slowest, len(profiles))} pages:")
+        for profile in sorted(profiles, key=PageProfile.total, reverse=True)[:slowest]:
+            busiest = max(STAGES, key=profile.seconds.__getitem__)
+            lines.append(
+                f"  {profile.total() * 1000:9.3f} ms  {profile.page}"
+                f"  ({busiest} {profile.seconds[busiest] * 1000:.3f} ms, {profile.nodes} nodes, {profile.bytes} bytes)"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+import heapq
+import os
+import re
+
+from htmlnode import escape, escape_attribute
+from writer import AtomicFile, remove_output
+
+SITEMAP_NAME = "sitemap.xml"
+# Limits from the sitemaps protocol, per file.
+SITEMAP_URLS = 50_000
+SITEMAP_BYTES = 50 * 1000 * 1000
+FEED_NAME = "feed.xml"
+REDIRECTS_NAME = "_redirects"
+
+_SHARD_RE = re.compile(r"sitemap-\d+\.xml")
+_URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_CLOSE = "</urlset>\n"
+
+
+def w3c_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def absolute_url(base_url, path):
+    return base_url.rstrip("/") + path
+
+
+class SitemapWriter:
+    # Streams <url> entries into sitemap.xml. Once a file reaches the
+    # protocol limits the entries roll over into sitemap-N.xml shards and
+    # sitemap.xml becomes their index. Only the open shard is kept, on disk.
+    def __init__(self, public_dir, base_url):
+        self.public_dir = public_dir
+        self.base_url = base_url
+        self.files = []
+        self.urls = 0
+        self._shards = []
+        self._current = None
+
+    def add(self, path, lastmod):
+        entry = (f"<url><loc>{escape(absolute_url(self.base_url, path))}</loc>"
+                 f"<lastmod>{w3c_time(lastmod)}</lastmod></url>\n")
+        size = len(entry.encode("utf-8"))
+        if self._current is not None and (self._count >= SITEMAP_URLS
+                                          or self._bytes + size + len(_URLSET_CLOSE) > SITEMAP_BYTES):
+            self._finish_shard()
+        if self._current is None:
+            self._current = AtomicFile(os.path.join(self.public_dir, SITEMAP_NAME))
+            self._current.write(_URLSET_OPEN)
+            self._count = 0
+            self._bytes = len(_URLSET_OPEN)
+        self._current.write(entry)
+        self._count += 1
+        self._bytes += size
+        self.urls += 1
+
+    def _finish_shard(self):
+        self._current.write(_URLSET_CLOSE)
+        name = f"sitemap-{len(self._shards) + 1}.xml"
+        self._current.commit(os.path.join(self.public_dir, name))
+        self._shards.append(name)
+        self._current = None
+
+    def close(self):
+        if self._shards:
+            if self._current is not None:
+                self._finish_shard()
+            with AtomicFile(os.path.join(self.public_dir, SITEMAP_NAME)) as index:
+                index.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+                for name in self._shards:
+                    index.write(f"<sitemap><loc>{escape(absolute_url(self.base_url, '/' + name))}</loc></sitemap>\n")
+                index.write("</sitemapindex>\n")
+        else:
+            if self._current is None:
+                self._current = AtomicFile(os.path.join(self.public_dir, SITEMAP_NAME))
+                self._current.write(_URLSET_OPEN)
+            self._current.write(_URLSET_CLOSE)
+            self._current.commit()
+        self.files = [SITEMAP_NAME] + self._shards
+        for name in sorted(os.listdir(self.public_dir)):
+            if _SHARD_RE.fullmatch(name) and name not in self._shards:
+                remove_output(self.public_dir, name)
+        return self.files
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._current is not None:
+            self._current.discard()
+        return False
+
+
+def write_sitemap(public_dir, base_url, pages):
+    # pages yields (url path, modification time) pairs.
+    with SitemapWriter(public_dir, base_url) as sitemap:
+        for path, lastmod in pages:
+            sitemap.add(path, lastmod)
+    return sitemap.files
+
+
+def write_feed(public_dir, base_url, title, pages, size=20, author=None):
+    # pages yields (url path, title, modification time); only the newest
+    # size entries are held, in a heap, while the rest stream past. Atom
+    # requires an author; the entries don't name one, so the feed does,
+    # falling back to the site title.
+    newest = heapq.nlargest(size, pages, key=lambda page: (page[2], page[0]))
+    updated = w3c_time(newest[0][2]) if newest else w3c_time(0)
+    feed_url = absolute_url(base_url, "/" + FEED_NAME)
+    with AtomicFile(os.path.join(public_dir, FEED_NAME)) as feed:
+        feed.write('<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        feed.write(f"<title>{escape(title)}</title>\n<id>{escape(feed_url)}</id>\n")
+        feed.write(f"<author><name>{escape(author or title)}</name></author>\n")
+        feed.write(f'<link rel="self" href="{escape_attribute(feed_url)}"/>\n<updated>{updated}</updated>\n')
+        for path, page_title, lastmod in newest:
+            url = absolute_url(base_url, path)
+            feed.write(f'<entry><title>{escape(page_title)}</title><link href="{escape_attribute(url)}"/>'
+                       f"<id>{escape(url)}</id><updated>{w3c_time(lastmod)}</updated></entry>\n")
+        feed.write("</feed>\n")
+    return [FEED_NAME]
+
+
+def load_redirects(public_dir):
+    redirects = {}
+    try:
+        with open(os.path.join(public_dir, REDIRECTS_NAME), encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and not parts[0].startswith("#"):
+                    redirects[parts[0]] = parts[1]
+    except FileNotFoundError:
+        pass
+    return redirects
+
+
+def update_redirects(redirects, moved, urls):
+    # moved maps old page URLs to where their content went this build.
+    # Earlier redirects pointing at a moved page follow it, and a URL that
+    # is a page again stops redirecting.
+    redirects = {**redirects, **moved}
+    updated = {}
+    for source, target in redirects.items():
+        seen = {source}
+        while target not in urls and target in redirects and target not in seen:
+            seen.add(target)
+            target = redirects[target]
+        if source not in urls and target in urls:
+            updated[source] = target
+    return updated
+
+
+def write_redirects(public_dir, redirects):
+    with AtomicFile(os.path.join(public_dir, REDIRECTS_NAME)) as f:
+        for source in sorted(redirects):
+            f.write(f"{source} {redirects[source]} 301\n")
+    return [REDIRECTS_NAME]
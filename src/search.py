@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import string
+
+from textnode import TextType
+
+# On-disk layout under public/search/:
+#   index.json   {"prefix_length": 2, "docs": [{"url", "title"}], "shards": [key, ...]}
+#   <key>.bin    terms sharing a prefix, sorted; per term:
+#                varint(len(term utf-8)) term varint(count) varint(doc id delta)...
+SEARCH_DIR = "search"
+INDEX_NAME = "index.json"
+PREFIX_LENGTH = 2
+
+_TERM_RE = re.compile(r"\w+")
+_SHARD_CHARS = frozenset(string.ascii_lowercase + string.digits)
+
+
+def page_terms(nodes):
+    terms = set()
+    for node in nodes:
+        if node.text_type != TextType.CODE:
+            terms.update(_TERM_RE.findall(node.text.lower()))
+    return terms
+
+
+def add_terms(postings, doc, terms):
+    for term in terms:
+        postings.setdefault(term, []).append(doc)
+
+
+def merge_postings(postings, partial, offset=0):
+    for term, docs in partial.items():
+        target = postings.setdefault(term, [])
+        target.extend(doc + offset for doc in docs)
+
+
+def remap_postings(postings, ids):
+    # Renumber documents through ids, dropping any that are not in it.
+    remapped = {}
+    for term, docs in postings.items():
+        mapped = [ids[doc] for doc in docs if doc in ids]
+        if mapped:
+            remapped[term] = mapped
+    return remapped
+
+
+def shard_key(term):
+    return "".join(c if c in _SHARD_CHARS else "_" for c in term[:PREFIX_LENGTH])
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_shard(postings):
+    out = bytearray()
+    for term in sorted(postings):
+        encoded = term.encode("utf-8")
+        encode_varint(len(encoded), out)
+        out += encoded
+        docs = sorted(postings[term])
+        encode_varint(len(docs), out)
+        previous = 0
+        for doc in docs:
+            encode_varint(doc - previous, out)
+            previous = doc
+    return bytes(out)
+
+
+def decode_shard(data):
+    postings = {}
+    pos = 0
+    while pos < len(data):
+        length, pos = decode_varint(data, pos)
+        term = data[pos:pos + length].decode("utf-8")
+        pos += length
+        count, pos = decode_varint(data, pos)
+        docs = []
+        doc = 0
+        for _ in range(count):
+            delta, pos = decode_varint(data, pos)
+            doc += delta
+            docs.append(doc)
+        postings[term] = docs
+    return postings
+
+
+def load_search_index(public_dir):
+    directory = os.path.join(public_dir, SEARCH_DIR)
+    try:
+        with open(os.path.join(directory, INDEX_NAME), encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return [], {}
+    postings = {}
+    for key in index.get("shards", []):
+        with open(os.path.join(directory, key + ".bin"), "rb") as f:
+            postings.update(decode_shard(f.read()))
+    return [doc["url"] for doc in index.get("docs", [])], postings
+
+
+def stale_search_files(public_dir, files):
+    directory = os.path.join(public_dir, SEARCH_DIR)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(os.path.join(SEARCH_DIR, name) for name in names
+                  if name.endswith(".bin") and os.path.join(SEARCH_DIR, name) not in files)
+
+
+def search_index_files(docs, postings):
+    shards = {}
+    for term, doc_ids in postings.items():
+        if doc_ids:
+            shards.setdefault(shard_key(term), {})[term] = doc_ids
+    files = {os.path.join(SEARCH_DIR, key + ".bin"): encode_shard(shards[key]) for key in sorted(shards)}
+    index = {"prefix_length": PREFIX_LENGTH, "docs": docs, "shards": sorted(shards)}
+    files[os.path.join(SEARCH_DIR, INDEX_NAME)] = json.dumps(index, indent=1, ensure_ascii=False).encode("utf-8")
+    return files
@@ -0,0 +1,188 @@
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build import RenderOptions, build_site, output_path, remove_output, render_page, write_page
+
+RELOAD_PATH = "/__reload"
+
+RELOAD_SCRIPT = """<script>
+new EventSource("%s").onmessage = function (event) {
+  var page = location.pathname.endsWith("/") ? location.pathname + "index.html" : location.pathname;
+  if (event.data === page) { location.reload(); }
+};
+</script>""" % RELOAD_PATH
+
+
+def scan_content(content_dir):
+    # Stat-only walk; slicing off the prefix is much cheaper than relpath
+    # when this runs every few tens of milliseconds over 10k+ files.
+    snapshot = {}
+    prefix = len(os.path.join(content_dir, ""))
+    stack = [content_dir]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.name.endswith(".md"):
+                    stat = entry.stat()
+                    snapshot[entry.path[prefix:]] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class ContentWatcher:
+    def __init__(self, content_dir):
+        self.content_dir = content_dir
+        self.snapshot = scan_content(content_dir)
+
+    def poll(self):
+        snapshot = scan_content(self.content_dir)
+        changed = sorted(page for page, stat in snapshot.items() if self.snapshot.get(page) != stat)
+        removed = sorted(page for page in self.snapshot if page not in snapshot)
+        self.snapshot = snapshot
+        return changed, removed
+
+
+class DevServer:
+    def __init__(self, content_dir, public_dir, host="127.0.0.1", port=8000, interval=0.05, template=None):
+        self.content_dir = content_dir
+        self.public_dir = public_dir
+        self.template = template
+        self.options = RenderOptions(template)
+        self.template_stamp = self.stat_template()
+        self.interval = interval
+        self.version = 0
+        self.last_changed = []
+        self.changed = threading.Condition()
+        self.stopped = threading.Event()
+        build_site(content_dir, public_dir, template=template)
+        self.watcher = ContentWatcher(content_dir)
+        handler = functools.partial(DevRequestHandler, self, directory=public_dir)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+
+    def rerender(self, changed, removed):
+        # Only the touched pages go through the pipeline. The build manifest
+        # is left alone, so the next full build re-renders these pages too.
+        # A page that fails to parse, vanished since the poll or cannot be
+        # written is reported and skipped; the others still go out.
+        for page in changed:
+            try:
+                html, _ = render_page(os.path.join(self.content_dir, page), self.options)
+                write_page(os.path.join(self.public_dir, output_path(page)), html)
+            except ValueError as e:
+                print(f"Could not render {e}")
+            except OSError as e:
+                print(f"Could not render {page}: {e}")
+        for page in removed:
+            remove_output(self.public_dir, output_path(page))
+        with self.changed:
+            self.version += 1
+            self.last_changed = ["/" + output_path(page).replace(os.sep, "/") for page in changed + removed]
+            self.changed.notify_all()
+
+    def stat_template(self):
+        if self.template is None:
+            return None
+        stat = os.stat(self.template)
+        return stat.st_mtime_ns, stat.st_size
+
+    def watch(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Say so and keep watching: files moving under the scan or
+                # a template mid-save usually settle by the next poll.
+                print(f"Watching {self.content_dir} failed: {e}")
+
+    def check(self):
+        changed, removed = self.watcher.poll()
+        stamp = self.stat_template()
+        if stamp != self.template_stamp:
+            # A new layout affects every page.
+            self.template_stamp = stamp
+            changed = sorted(self.watcher.snapshot)
+        if changed or removed:
+            start = time.perf_counter()
+            self.rerender(changed, removed)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Re-rendered {len(changed)} and removed {len(removed)} pages in {elapsed:.1f} ms")
+
+    def wait_for_change(self, version, timeout):
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version or self.stopped.is_set(), timeout)
+            return self.version, self.last_changed
+
+    def serve_forever(self):
+        watcher = threading.Thread(target=self.watch, daemon=True)
+        watcher.start()
+        host, port = self.httpd.server_address[:2]
+        print(f"Serving {self.public_dir} at http://{host}:{port}/ (watching {self.content_dir})")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.stopped.set()
+        with self.changed:
+            self.changed.notify_all()
+        self.httpd.server_close()
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, server, *args, **kwargs):
+        self.dev_server = server
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            return self.send_reload_events()
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            return self.send_page(path)
+        return super().do_GET()
+
+    def send_page(self, path):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        if "</body>" in html:
+            html = html.replace("</body>", RELOAD_SCRIPT + "</body>", 1)
+        else:
+            html += RELOAD_SCRIPT
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_reload_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        version = self.dev_server.version
+        try:
+            while not self.dev_server.stopped.is_set():
+                new_version, pages = self.dev_server.wait_for_change(version, timeout=15)
+                if new_version == version:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    version = new_version
+                    for page in pages:
+                        self.wfile.write(f"data: {page}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if not self.path.startswith(RELOAD_PATH):
+            super().log_message(format, *args)
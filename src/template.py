@@ -0,0 +1,63 @@
+import os
+import re
+import threading
+
+_SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    def __init__(self, source):
+        # Split once into literal chunks with slot names between them:
+        # literals[0], slots[0], literals[1], ..., literals[-1].
+        parts = _SLOT_RE.split(source)
+        self.literals = tuple(parts[0::2])
+        self.slots = tuple(parts[1::2])
+
+    def render(self, **values):
+        parts = [self.literals[0]]
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            try:
+                parts.append(values[slot])
+            except KeyError:
+                raise ValueError(f"Missing value for template slot '{slot}'") from None
+            parts.append(literal)
+        return "".join(parts)
+
+    def write(self, fileobj, **values):
+        # Like render, but a value may also be a function that writes its
+        # own text to fileobj, so a large slot is streamed in place.
+        fileobj.write(self.literals[0])
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            try:
+                value = values[slot]
+            except KeyError:
+                raise ValueError(f"Missing value for template slot '{slot}'") from None
+            if callable(value):
+                value(fileobj)
+            else:
+                fileobj.write(value)
+            fileobj.write(literal)
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots})"
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_template(path):
+    # Compiled templates are reused for every page this process renders and
+    # recompiled only when the file's mtime or size changes.
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    with open(path, encoding="utf-8") as f:
+        template = Template(f.read())
+    with _cache_lock:
+        _cache[key] = (stamp, template)
+    return template
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from assets import file_hash, hashed_name, sync_assets
+from build import build_site
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class TestSyncAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        write(os.path.join(self.static, "styles.css"), b"body {}")
+        write(os.path.join(self.static, "images", "logo.png"), b"\x89PNG logo")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copies_only_changed_files(self):
+        first = sync_assets(self.static, self.public)
+        self.assertEqual(first.copied, [os.path.join("images", "logo.png"), "styles.css"])
+
+        second = sync_assets(self.static, self.public)
+        self.assertEqual(second.copied, [])
+
+        write(os.path.join(self.static, "styles.css"), b"body { margin: 0 }")
+        third = sync_assets(self.static, self.public)
+        self.assertEqual(third.copied, ["styles.css"])
+        with open(os.path.join(self.public, "styles.css"), "rb") as f:
+            self.assertEqual(f.read(), b"body { margin: 0 }")
+
+    def test_touched_but_identical_file_is_not_copied(self):
+        sync_assets(self.static, self.public)
+        os.utime(os.path.join(self.static, "styles.css"), ns=(10**18, 10**18))
+        self.assertEqual(sync_assets(self.static, self.public).copied, [])
+        self.assertEqual(os.stat(os.path.join(self.public, "styles.css")).st_mtime_ns, 10**18)
+
+    def test_hashed_names_and_urls(self):
+        result = sync_assets(self.static, self.public, hashed=True)
+        logo = os.path.join(self.static, "images", "logo.png")
+        name = hashed_name(os.path.join("images", "logo.png"), file_hash(logo))
+        self.assertTrue(os.path.exists(os.path.join(self.public, name)))
+        self.assertEqual(result.urls["/images/logo.png"], "/" + name.replace(os.sep, "/"))
+
+        write(logo, b"\x89PNG new logo")
+        result = sync_assets(self.static, self.public, hashed=True)
+        self.assertEqual(result.removed, [name])
+        self.assertFalse(os.path.exists(os.path.join(self.public, name)))
+
+    def test_build_rewrites_image_sources(self):
+        content = os.path.join(self.tmp.name, "content")
+        write(os.path.join(content, "index.md"), b"![logo](/images/logo.png) ![remote](https://x.test/a.png)")
+        result = build_site(content, self.public, workers=2, static_dir=self.static, hash_assets=True)
+        hashed = result.assets.urls["/images/logo.png"]
+        with open(os.path.join(self.public, "index.html")) as f:
+            self.assertEqual(
+                f.read(),
+                f'<div><p><img src="{hashed}" alt="logo"></img> '
+                '<img src="https://x.test/a.png" alt="remote"></img></p></div>',
+            )
+
+    def test_build_resolves_relative_image_sources(self):
+        content = os.path.join(self.tmp.name, "content")
+        write(os.path.join(content, "index.md"), b"![logo](images/logo.png)")
+        write(os.path.join(content, "blog", "post.md"), b"![logo](images/logo.png)")
+        write(os.path.join(content, "blog", "up.md"), b"![logo](../images/logo.png)")
+        # The first two pages share a block, but not its rendering.
+        result = build_site(content, self.public, workers=1, static_dir=self.static, hash_assets=True,
+                            render_cache_size=16)
+        hashed = result.assets.urls["/images/logo.png"]
+        for page, src in (("index.html", hashed), (os.path.join("blog", "post.html"), "images/logo.png"),
+                          (os.path.join("blog", "up.html"), hashed)):
+            with open(os.path.join(self.public, page)) as f:
+                self.assertEqual(f.read(), f'<div><p><img src="{src}" alt="logo"></img></p></div>')
+
+    def test_changed_asset_rerenders_only_pages_that_show_it(self):
+        content = os.path.join(self.tmp.name, "content")
+        write(os.path.join(content, "index.md"), b"![logo](images/logo.png)")
+        write(os.path.join(content, "about.md"), b"no images here")
+        build_site(content, self.public, workers=1, static_dir=self.static, hash_assets=True)
+        write(os.path.join(self.static, "styles.css"), b"body { margin: 0 }")
+        self.assertEqual(build_site(content, self.public, workers=1, static_dir=self.static,
+                                    hash_assets=True).rendered, [])
+        write(os.path.join(self.static, "images", "logo.png"), b"\x89PNG new logo")
+        result = build_site(content, self.public, workers=1, static_dir=self.static, hash_assets=True)
+        self.assertEqual(result.rendered, ["index.md"])
+        with open(os.path.join(self.public, "index.html")) as f:
+            self.assertIn(result.assets.urls["/images/logo.png"], f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
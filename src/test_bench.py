@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from bench import (
+    STAGES,
+    bench_corpus,
+    build_large_input,
+    compare,
+    make_corpus,
+    parse_large_input,
+    write_large_input,
+)
+
+
+class TestBench(unittest.TestCase):
+    def test_corpora_are_reproducible(self):
+        self.assertEqual(make_corpus("inline_heavy", 0.5), make_corpus("inline_heavy", 0.5))
+
+    def test_bench_corpus_times_every_stage(self):
+        timings = bench_corpus(make_corpus("small_pages", 0.01), repeat=1)
+        self.assertEqual(tuple(timings), STAGES)
+
+    def test_compare_flags_slow_stages(self):
+        baseline = {"results": {"huge_page": {"to_html": 1.0, "text_to_textnodes": 1.0}}}
+        current = {"results": {"huge_page": {"to_html": 1.5, "text_to_textnodes": 1.1, "new_stage": 9.0}}}
+        self.assertEqual(compare(current, baseline, 0.25), [("huge_page", "to_html", 1.0, 1.5)])
+
+    def test_large_input_modes_agree(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "large.md")
+            self.assertGreaterEqual(write_large_input(path, 1), 1 << 20)
+            read_split = parse_large_input(path, "read_split")
+            mapped = parse_large_input(path, "mmap")
+        self.assertEqual(read_split["blocks"], mapped["blocks"])
+        self.assertGreater(mapped["peak_rss"], 0)
+
+    def test_build_large_input(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            write_large_input(os.path.join(content, "large.md"), 1)
+            result = build_large_input(content, os.path.join(tmp, "public"))
+            self.assertEqual(result["pages"], 1)
+            self.assertGreater(os.path.getsize(os.path.join(tmp, "public", "large.html")), 1 << 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
+import os
+import random
+import tempfile
 import unittest
-from blocktype import BlockType, block_to_block_type
+from unittest import mock
+
+from blocktype import BlockType, block_to_block_type, map_blocks, parse_blocks, read_blocks
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading_level_1(self):
@@ -65,10 +70,142 @@ line 2
         block = "1.first\n2.second"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_nested_lists(self):
+        self.assertEqual(block_to_block_type("- a\n  - b\n    1. c\n- d"), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type("1. a\n   - b\n2. c"), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type("- a\n  continued"), BlockType.UNORDERED_LIST)
+
+    def test_nested_list_needs_matching_top_level_items(self):
+        self.assertEqual(block_to_block_type("- a\n  - b\n1. c"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("- a\n  - b\nplain"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("2. a\n   - b"), BlockType.PARAGRAPH)
+
+    def test_nested_quote(self):
+        self.assertEqual(block_to_block_type("> a\n>> b\n> > c"), BlockType.QUOTE)
+
     def test_paragraph_fallback(self):
         block = "Just a normal paragraph\nwith multiple lines."
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
 
+class TestParseBlocks(unittest.TestCase):
+    def test_blocks_and_types(self):
+        md = """
+# This is a heading
+
+This is **bolded** paragraph
+with a second line
+
+- This is a list
+- with items
+
+1. one
+2. two
+"""
+        self.assertEqual(
+            list(parse_blocks(md.split("\n"))),
+            [
+                (BlockType.HEADING, "# This is a heading"),
+                (BlockType.PARAGRAPH, "This is **bolded** paragraph\nwith a second line"),
+                (BlockType.UNORDERED_LIST, "- This is a list\n- with items"),
+                (BlockType.ORDERED_LIST, "1. one\n2. two"),
+            ],
+        )
+
+    def test_extra_blank_lines_and_whitespace_trimmed(self):
+        md = "  first  \n\n\n\n   \n\nsecond\n   \n"
+        self.assertEqual(
+            list(parse_blocks(md.split("\n"))),
+            [(BlockType.PARAGRAPH, "first"), (BlockType.PARAGRAPH, "second")],
+        )
+
+    def test_fence_keeps_blank_lines(self):
+        md = "```\nline 1\n\nline 2\n```\n\nafter"
+        self.assertEqual(
+            list(parse_blocks(md.split("\n"))),
+            [
+                (BlockType.CODE, "```\nline 1\n\nline 2\n```"),
+                (BlockType.PARAGRAPH, "after"),
+            ],
+        )
+
+    def test_single_line_fence(self):
+        md = "```print('hello')```\n\nafter"
+        self.assertEqual(
+            list(parse_blocks(md.split("\n"))),
+            [
+                (BlockType.CODE, "```print('hello')```"),
+                (BlockType.PARAGRAPH, "after"),
+            ],
+        )
+
+    def test_read_blocks_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as f:
+                f.write("> quote\n> more\n\n```\na\n\nb\n```\n")
+            self.assertEqual(
+                list(read_blocks(path)),
+                [
+                    (BlockType.QUOTE, "> quote\n> more"),
+                    (BlockType.CODE, "```\na\n\nb\n```"),
+                ],
+            )
+
+
+class TestMapBlocks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+
+    def text_blocks(self):
+        with open(self.path, encoding="utf-8") as f:
+            return list(parse_blocks(f))
+
+    def test_matches_text_parse(self):
+        self.write("\n \n  # Title\n\n```\na\n\n``` not closed\nb ```  \ntail\n\n\n- é\n- ü\n\n```x```\n\nend")
+        self.assertEqual(list(map_blocks(self.path)), self.text_blocks())
+        self.assertEqual(len(self.text_blocks()), 5)
+
+    def test_unclosed_fence_and_empty_file(self):
+        self.write("para\n\n```\ncode\n\nmore")
+        self.assertEqual(list(map_blocks(self.path)), self.text_blocks())
+        with mock.patch("blocktype.MMAP_THRESHOLD", 0):
+            self.assertEqual(list(read_blocks(self.path)),
+                             [(BlockType.PARAGRAPH, "para"), (BlockType.CODE, "```\ncode\n\nmore")])
+        self.assertEqual(self.text_blocks()[-1], (BlockType.CODE, "```\ncode\n\nmore"))
+        self.write("")
+        self.assertEqual(list(map_blocks(self.path)), [])
+
+    def test_carriage_returns_use_text_mode(self):
+        self.write("# A\r\n\r\ntext\rmore\r\n")
+        self.assertEqual(list(map_blocks(self.path)), self.text_blocks())
+
+    def test_random_documents(self):
+        rng = random.Random(0)
+        pieces = ["word ", "\n", "\n\n", "```", "`", "- ", "1. ", "> ", "\t", " \n", "# ", "é"]
+        # Release mapped pages every page, so the release path runs too.
+        with mock.patch("blocktype._RELEASE_BYTES", 4096):
+            for _ in range(200):
+                self.write("".join(rng.choice(pieces) for _ in range(rng.randint(0, 3000))))
+                self.assertEqual(list(map_blocks(self.path)), self.text_blocks())
+
+    def test_read_blocks_maps_large_files(self):
+        self.write("# A\n\ntext")
+        with mock.patch("blocktype.map_blocks", wraps=map_blocks) as mapped:
+            list(read_blocks(self.path))
+            self.assertFalse(mapped.called)
+            with mock.patch("blocktype.MMAP_THRESHOLD", 1):
+                self.assertEqual(list(read_blocks(self.path)), self.text_blocks())
+            self.assertTrue(mapped.called)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,331 @@
+from concurrent.futures import Future
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from build import bounded_map, build_site, find_markdown_files, merge_shards, shard_of
+from manifest import MANIFEST_NAME
+
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome to the **site**.",
+    "blog/first.md": "# First\n\n- [home](/index.html)\n- item",
+    "blog/deep/second.md": "```\ncode\n```",
+    "notes.txt": "not markdown",
+}
+
+
+def read_tree(root):
+    tree = {}
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            if name == MANIFEST_NAME:
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                tree[os.path.relpath(path, root)] = f.read()
+    return tree
+
+
+class TestBuildSite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        for page, text in PAGES.items():
+            path = os.path.join(self.content, page)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_markdown_files_is_sorted(self):
+        self.assertEqual(
+            find_markdown_files(self.content),
+            [
+                os.path.join("blog", "deep", "second.md"),
+                os.path.join("blog", "first.md"),
+                "index.md",
+            ],
+        )
+
+    def test_build_writes_html(self):
+        public = os.path.join(self.tmp.name, "public")
+        build_site(self.content, public, workers=1)
+        self.assertEqual(
+            read_tree(public),
+            {
+                "index.html": b"<div><h1>Home</h1><p>Welcome to the <b>site</b>.</p></div>",
+                os.path.join("blog", "first.html"):
+                    b'<div><h1>First</h1><ul><li><a href="/index.html">home</a></li><li>item</li></ul></div>',
+                os.path.join("blog", "deep", "second.html"): b"<div><pre><code>code\n</code></pre></div>",
+            },
+        )
+
+    def test_output_independent_of_worker_count(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        build_site(self.content, serial, workers=1)
+        build_site(self.content, parallel, workers=3)
+        self.assertEqual(read_tree(serial), read_tree(parallel))
+
+    def write_source(self, page, text):
+        with open(os.path.join(self.content, page), "w") as f:
+            f.write(text)
+
+    def test_bounded_map_limits_tasks_in_flight(self):
+        class RecordingExecutor:
+            submitted = 0
+
+            def submit(self, func, item):
+                self.submitted += 1
+                future = Future()
+                future.set_result(func(item))
+                return future
+
+        executor = RecordingExecutor()
+        results = bounded_map(executor, lambda item: item * 2, range(50), 3)
+        self.assertEqual(next(results), 0)
+        # Nothing past the first three is submitted until a result is taken.
+        self.assertEqual(executor.submitted, 3)
+        self.assertEqual(list(results), [i * 2 for i in range(1, 50)])
+
+    def test_rebuild_renders_only_changed_pages(self):
+        public = os.path.join(self.tmp.name, "public")
+        first = build_site(self.content, public, workers=1)
+        self.assertEqual(len(first.rendered), 3)
+
+        self.assertEqual(build_site(self.content, public, workers=1).rendered, [])
+
+        self.write_source("index.md", "# Changed")
+        result = build_site(self.content, public, workers=1)
+        self.assertEqual(result.rendered, ["index.md"])
+        self.assertEqual(read_tree(public)["index.html"], b"<div><h1>Changed</h1></div>")
+
+    def test_rebuild_removes_deleted_pages(self):
+        public = os.path.join(self.tmp.name, "public")
+        build_site(self.content, public, workers=1)
+        os.remove(os.path.join(self.content, "blog", "deep", "second.md"))
+
+        result = build_site(self.content, public, workers=1)
+        self.assertEqual(result.removed, [os.path.join("blog", "deep", "second.md")])
+        self.assertFalse(os.path.exists(os.path.join(public, "blog", "deep")))
+        self.assertTrue(os.path.exists(os.path.join(public, "blog", "first.html")))
+
+    def test_rebuild_rerenders_missing_outputs(self):
+        public = os.path.join(self.tmp.name, "public")
+        build_site(self.content, public, workers=1)
+        os.remove(os.path.join(public, "index.html"))
+        self.assertEqual(build_site(self.content, public, workers=1).rendered, ["index.md"])
+
+    def test_generator_change_invalidates_manifest(self):
+        public = os.path.join(self.tmp.name, "public")
+        build_site(self.content, public, workers=1)
+        with mock.patch("manifest._generator_version", "other"):
+            self.assertEqual(len(build_site(self.content, public, workers=1).rendered), 3)
+
+    def test_force_rerenders_everything(self):
+        public = os.path.join(self.tmp.name, "public")
+        build_site(self.content, public, workers=1)
+        result = build_site(self.content, public, workers=1, force=True)
+        self.assertEqual(len(result.rendered), 3)
+        self.assertEqual((result.written, result.skipped), (0, 3))
+
+    def test_inline_cache_keeps_output_and_reports_counters(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        cached = os.path.join(self.tmp.name, "cached")
+        build_site(self.content, plain, workers=1)
+        for workers in (1, 2):
+            result = build_site(self.content, cached, workers=workers, force=True, inline_cache_size=8)
+            self.assertEqual(read_tree(plain), read_tree(cached))
+            self.assertEqual(result.inline_cache["misses"], 5)
+            self.assertEqual(result.inline_cache["hits"], 0)
+
+    def test_render_cache_keeps_output_and_reports_counters(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        cached = os.path.join(self.tmp.name, "cached")
+        self.write_source("notes.md", "# Notes\n\nWelcome to the **site**.")
+        build_site(self.content, plain, workers=1, search=True, links=True)
+        for workers in (1, 2):
+            result = build_site(self.content, cached, workers=workers, force=True, render_cache_size=8,
+                                search=True, links=True)
+            self.assertEqual(read_tree(plain), read_tree(cached))
+            self.assertEqual(result.render_cache["hits"] + result.render_cache["misses"], 7)
+        self.assertEqual(build_site(self.content, cached, workers=1, force=True, render_cache_size=8)
+                         .render_cache, {"hits": 1, "misses": 6, "evictions": 0})
+
+    def test_template_wraps_pages_and_invalidates_manifest(self):
+        public = os.path.join(self.tmp.name, "public")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        build_site(self.content, public, workers=2, template=template)
+        tree = read_tree(public)
+        self.assertEqual(tree["index.html"], b"<title>Home</title><div><h1>Home</h1><p>Welcome to the <b>site</b>.</p></div>")
+        self.assertEqual(tree[os.path.join("blog", "deep", "second.html")],
+                         b"<title>second</title><div><pre><code>code\n</code></pre></div>")
+
+        self.assertEqual(build_site(self.content, public, workers=1, template=template).rendered, [])
+        with open(template, "w") as f:
+            f.write("<h6>{{ Title }}</h6>{{ Content }}")
+        self.assertEqual(len(build_site(self.content, public, workers=1, template=template).rendered), 3)
+
+    def test_large_pages_stream_to_their_output(self):
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.write_source("index.md", "intro\n\n# Home & Away\n\n## Part\n\n- [a](/blog/first.html)\n  - b\n\n> q\n>> qq")
+        options = dict(workers=1, template=template, toc=True, search=True, links=True)
+        buffered = os.path.join(self.tmp.name, "buffered")
+        streamed = os.path.join(self.tmp.name, "streamed")
+        # Buffered pages get their table of contents from the body's own pass.
+        with mock.patch("build.page_toc", side_effect=AssertionError("extra pass")):
+            expected = build_site(self.content, buffered, **options)
+        with mock.patch("build.STREAM_THRESHOLD", 0):
+            result = build_site(self.content, streamed, **options)
+            self.assertEqual(read_tree(streamed), read_tree(buffered))
+            self.assertEqual(result.written, expected.written)
+            with open(os.path.join(streamed, MANIFEST_NAME)) as f, open(os.path.join(buffered, MANIFEST_NAME)) as g:
+                self.assertEqual(f.read(), g.read())
+            profiled = build_site(self.content, streamed, force=True, profile=True, **options)
+            self.assertEqual((profiled.written, profiled.skipped), (0, result.written))
+            by_page = {p.page: p for p in profiled.profiles}
+            index = by_page[os.path.join(self.content, "index.md")]
+            # Five blocks, pulled for the table of contents, up to the title
+            # for the layout, then for the body.
+            self.assertEqual(index.calls["split"], 5 + 2 + 5)
+            self.assertEqual(index.bytes, os.path.getsize(os.path.join(streamed, "index.html")))
+
+    def test_template_title_is_plain_escaped_text(self):
+        public = os.path.join(self.tmp.name, "public")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.write_source("index.md", "# Fish & <Chips> **bold** [link](/x.html)")
+        build_site(self.content, public, workers=1, template=template)
+        self.assertTrue(read_tree(public)["index.html"].startswith(
+            b"<title>Fish &amp; &lt;Chips&gt; bold link</title><div><h1>Fish &amp; &lt;Chips&gt; <b>bold</b>"))
+
+    def test_missing_content_dir_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            build_site(os.path.join(self.tmp.name, "missing"), self.tmp.name)
+
+    def test_render_errors_name_the_page(self):
+        public = os.path.join(self.tmp.name, "public")
+        self.write_source("blog/bad.md", "**unclosed")
+        for workers in (1, 2):
+            with self.assertRaisesRegex(ValueError, "^" + re.escape(os.path.join(self.content, "blog", "bad.md"))):
+                build_site(self.content, public, workers=workers, force=True)
+
+    def test_main_reports_errors_without_traceback(self):
+        main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        missing = os.path.join(self.tmp.name, "missing")
+        process = subprocess.run([sys.executable, main, "build", missing], capture_output=True, text=True)
+        self.assertEqual(process.returncode, 1)
+        self.assertEqual(process.stderr, f"main.py: error: Content directory not found: {missing}\n")
+
+
+class TestShardedBuild(unittest.TestCase):
+    OPTIONS = ["--headings", "--search", "--check-links", "--base-url", "https://example.com", "--redirects",
+               "--hash-assets"]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(self.static)
+        with open(os.path.join(self.static, "logo.png"), "wb") as f:
+            f.write(b"png")
+        for i in range(12):
+            self.write_source(f"section{i % 3}/page{i}.md",
+                              f"# Page {i}\n\nSee [next](/section{(i + 1) % 3}/page{(i + 1) % 12}.html#page-{(i + 1) % 12})"
+                              f" and ![logo](/logo.png).\n\n## Words {i}\n\nshared words and term{i}", i)
+        self.write_source("index.md", "# Home\n\n[first](/section0/page0.html)", 100)
+        self.write_source("extra/unlinked.md", "Nothing links here.", 50)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_source(self, page, text, mtime):
+        path = os.path.join(self.content, page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        os.utime(path, (mtime, mtime))
+
+    def command(self, *args):
+        main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        return [sys.executable, main, *args, "--static", self.static, *self.OPTIONS]
+
+    def run_main(self, *args):
+        subprocess.run(self.command(*args), check=True, stdout=subprocess.DEVNULL)
+
+    def build_shards(self, shards):
+        # Each shard in its own interpreter, all at once, as on separate CI runners.
+        dirs = [os.path.join(self.tmp.name, f"shard{i}") for i in range(shards)]
+        processes = [subprocess.Popen(self.command("build", self.content, shard_dir, "-j", "1",
+                                                   "--shard", f"{i}/{shards}"), stdout=subprocess.DEVNULL)
+                     for i, shard_dir in enumerate(dirs)]
+        self.assertEqual([process.wait() for process in processes], [0] * shards)
+        return dirs
+
+    def assert_same_tree(self, expected, actual):
+        self.assertEqual(read_tree(actual), read_tree(expected))
+        manifests = []
+        for public in (expected, actual):
+            with open(os.path.join(public, MANIFEST_NAME), "rb") as f:
+                manifests.append(f.read())
+        self.assertEqual(manifests[1], manifests[0])
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual(shard_of(os.path.join("a", "b.md"), 7), shard_of("a/b.md", 7))
+        pages = find_markdown_files(self.content)
+        self.assertEqual({shard_of(page, 3) for page in pages}, {0, 1, 2})
+
+    def test_merged_shards_match_unsharded_build(self):
+        single = os.path.join(self.tmp.name, "single")
+        merged = os.path.join(self.tmp.name, "merged")
+        self.run_main("build", self.content, single, "-j", "2")
+        shards = self.build_shards(3)
+        self.run_main("merge", self.content, merged, *shards)
+        self.assert_same_tree(single, merged)
+        self.assertTrue(os.path.exists(os.path.join(merged, "search", "index.json")))
+        self.assertTrue(os.path.exists(os.path.join(merged, "headings.json")))
+
+        # Moving and editing pages: only the affected shards change, and the
+        # merge only copies what differs from the previous merge.
+        os.rename(os.path.join(self.content, "extra", "unlinked.md"), os.path.join(self.content, "moved.md"))
+        self.write_source("section2/page2.md", "# Page 2\n\nrewritten [home](/index.html)", 2)
+        self.run_main("build", self.content, single, "-j", "2")
+        shards = self.build_shards(3)
+        result = merge_shards(self.content, shards, merged, static_dir=self.static, hash_assets=True, headings=True,
+                              search=True, links=True, base_url="https://example.com", redirects=True)
+        self.assertEqual(sorted(result.rendered), ["moved.md", os.path.join("section2", "page2.md")])
+        self.assertEqual(result.removed, [os.path.join("extra", "unlinked.md")])
+        with open(os.path.join(merged, "_redirects")) as f:
+            self.assertEqual(f.read(), "/extra/unlinked.html /moved.html 301\n")
+        self.assert_same_tree(single, merged)
+
+    def test_merge_rejects_mismatched_shards(self):
+        shards = [os.path.join(self.tmp.name, f"shard{i}") for i in range(2)]
+        for i, shard_dir in enumerate(shards):
+            build_site(self.content, shard_dir, workers=1, shard=(i, 2))
+        merged = os.path.join(self.tmp.name, "merged")
+        with self.assertRaises(ValueError):
+            merge_shards(self.content, shards, merged, headings=True)
+        with self.assertRaises(ValueError):
+            merge_shards(self.content, shards, merged, search=True)
+        with self.assertRaises(ValueError):
+            merge_shards(self.content, shards[::-1], merged)
+        self.write_source("index.md", "# Changed", 100)
+        with self.assertRaises(ValueError):
+            merge_shards(self.content, shards, merged)
+
+
+if __name__ == "__main__":
+    unittest.main()
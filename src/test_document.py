@@ -0,0 +1,55 @@
+import unittest
+
+from document import Document
+from functions import markdown_to_html_node
+
+MARKDOWN = """# Guide
+
+Intro with **bold** text.
+
+## Install
+
+Run `pip install`.
+
+### Extras
+
+- [docs](/docs)
+
+## **Usage** notes
+
+Call it.
+"""
+
+
+class TestDocument(unittest.TestCase):
+    def test_render_matches_eager_pipeline(self):
+        self.assertEqual(Document.from_markdown(MARKDOWN).render(), markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_blocks_render_lazily(self):
+        doc = Document.from_markdown(MARKDOWN)
+        self.assertEqual(doc.preview(2), "<div><h1>Guide</h1><p>Intro with <b>bold</b> text.</p></div>")
+        self.assertEqual(repr(doc), "Document(8 blocks, 2 rendered)")
+
+    def test_iter_html_streams_blocks(self):
+        chunks = list(Document.from_markdown(MARKDOWN).iter_html(0, 1))
+        self.assertEqual(chunks, ["<div>", "<h1>Guide</h1>", "</div>"])
+
+    def test_section_stops_at_same_level_heading(self):
+        doc = Document.from_markdown(MARKDOWN)
+        self.assertEqual(
+            doc.section("Install"),
+            '<div><h2>Install</h2><p>Run <code>pip install</code>.</p>'
+            '<h3>Extras</h3><ul><li><a href="/docs">docs</a></li></ul></div>',
+        )
+        self.assertEqual(doc.section("Usage notes"), "<div><h2><b>Usage</b> notes</h2><p>Call it.</p></div>")
+
+    def test_missing_section_raises(self):
+        with self.assertRaises(KeyError):
+            Document.from_markdown(MARKDOWN).section("Nope")
+
+    def test_title(self):
+        self.assertEqual(Document.from_markdown(MARKDOWN).title, "Guide")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from functions import markdown_to_html_node
+from headings import HeadingIndex, slugify
+
+
+class TestSlugify(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  snake_case -- API  "), "snakecase-api")
+
+    def test_duplicates_get_suffixes(self):
+        index = HeadingIndex()
+        self.assertEqual(
+            [index.add(2, "Usage"), index.add(2, "Usage"), index.add(2, "Usage-1"), index.add(2, "Usage")],
+            ["usage", "usage-1", "usage-1-1", "usage-2"],
+        )
+
+    def test_empty_heading_slug(self):
+        self.assertEqual(HeadingIndex().add(1, "!!!"), "section")
+
+
+class TestHeadingIndex(unittest.TestCase):
+    def test_ids_and_index_from_single_parse(self):
+        index = HeadingIndex()
+        html = markdown_to_html_node("# The **Guide**\n\ntext\n\n## Setup\n\n## Setup", index).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1 id="the-guide">The <b>Guide</b></h1><p>text</p>'
+            '<h2 id="setup">Setup</h2><h2 id="setup-1">Setup</h2></div>',
+        )
+        self.assertEqual(
+            index.headings,
+            [
+                {"level": 1, "text": "The Guide", "slug": "the-guide"},
+                {"level": 2, "text": "Setup", "slug": "setup"},
+                {"level": 2, "text": "Setup", "slug": "setup-1"},
+            ],
+        )
+
+    def test_toc_nests_by_level(self):
+        index = HeadingIndex()
+        for level, text in [(1, "A"), (2, "B"), (3, "C"), (2, "D"), (1, "E")]:
+            index.add(level, text)
+        self.assertEqual(
+            index.toc_node().to_html(),
+            '<nav class="toc"><ul>'
+            '<li><a href="#a">A</a><ul>'
+            '<li><a href="#b">B</a><ul><li><a href="#c">C</a></li></ul></li>'
+            '<li><a href="#d">D</a></li></ul></li>'
+            '<li><a href="#e">E</a></li>'
+            "</ul></nav>",
+        )
+
+    def test_no_headings_no_toc(self):
+        self.assertIsNone(HeadingIndex().toc_node())
+
+
+class TestBuildHeadings(unittest.TestCase):
+    def test_site_index_survives_incremental_builds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            public = os.path.join(tmp, "public")
+            os.makedirs(content)
+            for name, text in {"a.md": "# A\n\n## Part", "b.md": "plain"}.items():
+                with open(os.path.join(content, name), "w") as f:
+                    f.write(text)
+            build_site(content, public, workers=1, toc=True)
+            with open(os.path.join(public, "a.html")) as f:
+                self.assertTrue(f.read().startswith('<div><nav class="toc"><ul><li><a href="#a">A</a>'))
+
+            with open(os.path.join(content, "b.md"), "w") as f:
+                f.write("# B")
+            result = build_site(content, public, workers=1, toc=True)
+            self.assertEqual(result.rendered, ["b.md"])
+            with open(os.path.join(public, "headings.json")) as f:
+                self.assertEqual(
+                    json.load(f),
+                    {
+                        "/a.html": [
+                            {"level": 1, "text": "A", "slug": "a"},
+                            {"level": 2, "text": "Part", "slug": "part"},
+                        ],
+                        "/b.html": [{"level": 1, "text": "B", "slug": "b"}],
+                    },
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
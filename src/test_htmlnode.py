@@ -1,5 +1,6 @@
+import io
 import unittest
-from htmlnode import HTMLNode, LeafNode
+from htmlnode import HTMLNode, LeafNode, Markup, ParentNode, escape, escape_attribute
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -49,6 +50,10 @@ class TestHTMLNode(unittest.TestCase):
             "HTMLNode(p, What a strange world, children: None, {'class': 'primary'})",
         )
 
+    def test_slotted(self):
+        for node in (HTMLNode("p"), LeafNode("p", "x"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
     def test_leaf_to_html_p(self):
         node = LeafNode("p", "Hello, world!")
         self.assertEqual(node.to_html(), "<p>Hello, world!</p>")
@@ -65,5 +70,83 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(node.to_html(), "Hello, world!")
 
 
+class TestParentNode(unittest.TestCase):
+    def test_to_html_with_grandchildren(self):
+        grandchild = LeafNode("b", "grandchild")
+        child = ParentNode("span", [grandchild])
+        parent = ParentNode("div", [child], {"class": "box"})
+        self.assertEqual(
+            parent.to_html(),
+            '<div class="box"><span><b>grandchild</b></span></div>',
+        )
+
+    def test_to_html_many_children(self):
+        node = ParentNode(
+            "p",
+            [
+                LeafNode("b", "Bold text"),
+                LeafNode(None, "Normal text"),
+                LeafNode("i", "italic text"),
+            ],
+        )
+        self.assertEqual(
+            node.to_html(),
+            "<p><b>Bold text</b>Normal text<i>italic text</i></p>",
+        )
+
+    def test_missing_children_raises(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", [])]).to_html()
+
+    def test_iter_html_chunks_join_to_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode("a", "x", {"href": "/"})])])
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), '<ul><li><a href="/">x</a></li></ul>')
+
+    def test_write_html(self):
+        node = ParentNode("p", [LeafNode(None, "hi")])
+        out = io.StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), "<p>hi</p>")
+
+    def test_leaf_write_html(self):
+        out = io.StringIO()
+        LeafNode("b", "hi").write_html(out)
+        self.assertEqual(out.getvalue(), "<b>hi</b>")
+
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div>" * 5000 + "x"))
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape(self):
+        self.assertEqual(escape('a < b && c > "d"'), 'a &lt; b &amp;&amp; c &gt; "d"')
+        self.assertEqual(escape_attribute('/q?a=1&b="2"'), "/q?a=1&amp;b=&quot;2&quot;")
+        self.assertEqual(escape_attribute(3), "3")
+
+    def test_clean_text_is_returned_as_is(self):
+        text = "nothing to escape here"
+        self.assertIs(escape(text), text)
+        self.assertIs(escape_attribute(text), text)
+
+    def test_markup_is_not_escaped_twice(self):
+        self.assertEqual(escape(Markup("<b>&amp;</b>")), "<b>&amp;</b>")
+        self.assertEqual(LeafNode(None, Markup("<i>x</i>")).to_html(), "<i>x</i>")
+        self.assertEqual(LeafNode("span", Markup(escape("<&>"))).to_html(), "<span>&lt;&amp;&gt;</span>")
+
+    def test_leaf_and_props_are_escaped(self):
+        node = LeafNode("a", "Q&A <now>", {"href": '/x?a=1&b=2', "title": 'say "hi"'})
+        self.assertEqual(
+            node.to_html(),
+            '<a href="/x?a=1&amp;b=2" title="say &quot;hi&quot;">Q&amp;A &lt;now&gt;</a>',
+        )
+        self.assertEqual(ParentNode("p", [LeafNode(None, "1 < 2")]).to_html(), "<p>1 &lt; 2</p>")
+
+
 if __name__ == "__main__":
     unittest.main()
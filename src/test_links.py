@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from functions import set_text_collector, text_to_children
+from links import find_broken_links, is_internal, locate, page_links, resolve
+
+
+class TestResolve(unittest.TestCase):
+    def test_is_internal(self):
+        self.assertTrue(is_internal("/about.html"))
+        self.assertTrue(is_internal("../img/a.png"))
+        self.assertTrue(is_internal("#top"))
+        self.assertFalse(is_internal("https://example.com"))
+        self.assertFalse(is_internal("mailto:me@example.com"))
+        self.assertFalse(is_internal("//cdn.example.com/a.js"))
+
+    def test_resolve(self):
+        self.assertEqual(resolve("/blog/first.html", "/index.html"), ("/index.html", ""))
+        self.assertEqual(resolve("/blog/first.html", "second.html#intro"), ("/blog/second.html", "intro"))
+        self.assertEqual(resolve("/blog/first.html", "../img/a.png?v=2"), ("/img/a.png", ""))
+        self.assertEqual(resolve("/blog/first.html", "/docs/"), ("/docs/index.html", ""))
+        self.assertEqual(resolve("/blog/first.html", "#top"), ("/blog/first.html", "top"))
+
+
+class TestLinkGraph(unittest.TestCase):
+    def test_collects_links_and_images(self):
+        collected = []
+        previous = set_text_collector(collected)
+        try:
+            text_to_children("[a](/a.html) ![pic](/p.png) [again](/a.html) **b**")
+        finally:
+            set_text_collector(previous)
+        self.assertEqual(page_links(collected), {"links": ["/a.html"], "images": ["/p.png"]})
+
+    def test_find_broken_links(self):
+        graph = {
+            "index.md": ("/index.html", {"links": ["/about.html#team", "/gone.html", "https://x.org"],
+                                         "images": ["/logo.png"]}),
+            "about.md": ("/about.html", {"links": ["index.html#nope", "/blog"], "images": []}),
+        }
+        targets = {"/index.html", "/about.html", "/blog/index.html"}
+        anchors = {"/about.html": {"team"}, "/index.html": {"home"}}
+        broken = find_broken_links(graph, targets, anchors)
+        self.assertEqual(
+            [(link.page, link.kind, link.url, link.reason) for link in broken],
+            [
+                ("about.md", "link", "index.html#nope", "missing anchor"),
+                ("index.md", "link", "/gone.html", "missing target"),
+                ("index.md", "image", "/logo.png", "missing target"),
+            ],
+        )
+
+    def test_locate(self):
+        graph = {"a.md": ("/a.html", {"links": ["/x.html"]})}
+        broken = find_broken_links(graph, set())
+        locate("# A\n\nsee [x](/x.html)\n", broken)
+        self.assertEqual(broken[0].location(), "a.md:3:9")
+
+
+class TestBuildCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        with open(os.path.join(self.static, "logo.png"), "wb") as f:
+            f.write(b"png")
+        self.write_source("index.md", "# Home\n\n[post](blog/post.html) ![logo](/logo.png)")
+        self.write_source("blog/post.md", "# Post\n\n[home](../index.html#home)\n\n[old](/old.html)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_source(self, page, text):
+        with open(os.path.join(self.content, page), "w") as f:
+            f.write(text)
+
+    def build(self, **kwargs):
+        return build_site(self.content, self.public, workers=1, static_dir=self.static, links=True, **kwargs)
+
+    def test_reports_broken_links_with_locations(self):
+        result = self.build(hash_assets=True, headings=True)
+        self.assertEqual([link.location() for link in result.broken_links],
+                         [os.path.join("blog", "post.md") + ":5:7"])
+        self.assertEqual(result.broken_links[0].url, "/old.html")
+
+    def test_hashed_assets_are_only_found_through_images(self):
+        with open(os.path.join(self.static, "doc.pdf"), "wb") as f:
+            f.write(b"pdf")
+        self.write_source("index.md", "# Home\n\n[download](/doc.pdf) ![logo](/logo.png) ![doc](doc.pdf)")
+        self.assertEqual([link.url for link in self.build().broken_links], ["/old.html"])
+        self.assertEqual([(link.kind, link.url) for link in self.build(hash_assets=True).broken_links],
+                         [("link", "/old.html"), ("link", "/doc.pdf")])
+
+    def test_unchanged_pages_keep_their_links(self):
+        self.build()
+        self.write_source("index.md", "# Home\n\n[missing](/nowhere.html)")
+        result = self.build()
+        self.assertEqual(result.rendered, ["index.md"])
+        self.assertEqual(sorted(link.url for link in result.broken_links), ["/nowhere.html", "/old.html"])
+
+    def test_enabling_check_renders_pages_without_links(self):
+        build_site(self.content, self.public, workers=1)
+        self.assertEqual(len(self.build().rendered), 2)
+        self.assertEqual(self.build().rendered, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from lrucache import LRUCache
+from functions import markdown_to_html_node, set_inline_cache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = LRUCache(2)
+        calls = []
+        compute = lambda key: calls.append(key) or key.upper()
+        self.assertEqual(cache.get("a", compute), "A")
+        self.assertEqual(cache.get("a", compute), "A")
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(cache.counters(), {"hits": 1, "misses": 1, "evictions": 0, "size": 1})
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.get("a", str.upper)
+        cache.get("b", str.upper)
+        cache.get("a", str.upper)
+        cache.get("c", str.upper)
+        self.assertEqual(cache.evictions, 1)
+        cache.get("a", str.upper)
+        self.assertEqual(cache.hits, 2)
+        cache.get("b", str.upper)
+        self.assertEqual(cache.misses, 4)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+
+class TestInlineCache(unittest.TestCase):
+    def tearDown(self):
+        set_inline_cache(None)
+
+    def test_output_unchanged(self):
+        md = "# **Title**\n\n- [home](/) and _more_\n- [home](/) and _more_\n\nA `code` ![img](/i.png)"
+        expected = markdown_to_html_node(md).to_html()
+        cache = LRUCache(16)
+        set_inline_cache(cache)
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.hits, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+import blocktype
+import functions
+import profiling
+from build import build_site
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(self.content)
+        pages = {"a.md": "# A\n\nSome **text**.", "b.md": "- [one](/one)\n- two\n\nend"}
+        for name, text in pages.items():
+            with open(os.path.join(self.content, name), "w") as f:
+                f.write(text)
+
+    def tearDown(self):
+        profiling.uninstall()
+        self.tmp.cleanup()
+
+    def test_install_and_uninstall_restore_functions(self):
+        original = functions.text_to_textnodes
+        profiling.install()
+        profiling.install()
+        self.assertIsNot(functions.text_to_textnodes, original)
+        profiling.uninstall()
+        self.assertIs(functions.text_to_textnodes, original)
+
+    def test_hooks_only_record_inside_a_page(self):
+        profiling.install()
+        functions.text_to_textnodes("outside any page")
+        with profiling.page("p") as profile:
+            blocktype.block_to_block_type("# heading")
+            functions.text_to_textnodes("**a** b")
+        self.assertEqual(profile.calls["classify"], 1)
+        self.assertEqual(profile.calls["inline"], 1)
+        self.assertEqual(profile.nodes, 2)
+
+    def test_build_collects_page_profiles(self):
+        public = os.path.join(self.tmp.name, "public")
+        original = functions.text_to_textnodes
+        result = build_site(self.content, public, workers=1, profile=True)
+        self.assertIs(functions.text_to_textnodes, original)
+        self.assertEqual(len(result.profiles), 2)
+        by_page = {os.path.basename(p.page): p for p in result.profiles}
+        self.assertEqual(by_page["a.md"].calls["split"], 2)
+        self.assertEqual(by_page["b.md"].calls["inline"], 3)
+        with open(os.path.join(public, "a.html"), "rb") as f:
+            self.assertEqual(by_page["a.md"].bytes, len(f.read()))
+        report = profiling.format_report(result.profiles, 1)
+        self.assertIn("Slowest 1 pages:", report)
+
+    def test_profiling_does_not_change_output(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        profiled = os.path.join(self.tmp.name, "profiled")
+        build_site(self.content, plain, workers=1)
+        build_site(self.content, profiled, workers=2, profile=True)
+        for name in ("a.html", "b.html"):
+            with open(os.path.join(plain, name)) as f, open(os.path.join(profiled, name)) as g:
+                self.assertEqual(f.read(), g.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from xml.etree import ElementTree
+
+from build import build_site
+from publish import SitemapWriter, load_redirects, update_redirects, write_feed, write_sitemap
+
+NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9", "atom": "http://www.w3.org/2005/Atom"}
+
+
+def parse(path):
+    return ElementTree.parse(path).getroot()
+
+
+class TestSitemap(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_single_sitemap(self):
+        files = write_sitemap(self.public, "https://example.com/", [("/a.html", 0), ("/q&a.html", 86400)])
+        self.assertEqual(files, ["sitemap.xml"])
+        root = parse(os.path.join(self.public, "sitemap.xml"))
+        self.assertEqual([loc.text for loc in root.iterfind("sm:url/sm:loc", NS)],
+                         ["https://example.com/a.html", "https://example.com/q&a.html"])
+        self.assertEqual(root.find("sm:url/sm:lastmod", NS).text, "1970-01-01T00:00:00Z")
+
+    def test_empty_sitemap(self):
+        write_sitemap(self.public, "https://example.com", [])
+        self.assertEqual(len(parse(os.path.join(self.public, "sitemap.xml"))), 0)
+
+    def test_shards_and_index(self):
+        pages = [(f"/p{i}.html", 0) for i in range(7)]
+        with mock.patch("publish.SITEMAP_URLS", 3):
+            files = write_sitemap(self.public, "https://example.com", pages)
+        self.assertEqual(files, ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"])
+        index = parse(os.path.join(self.public, "sitemap.xml"))
+        self.assertEqual([loc.text for loc in index.iterfind("sm:sitemap/sm:loc", NS)],
+                         [f"https://example.com/sitemap-{i}.xml" for i in (1, 2, 3)])
+        shards = [parse(os.path.join(self.public, f"sitemap-{i}.xml")) for i in (1, 2, 3)]
+        self.assertEqual([len(shard) for shard in shards], [3, 3, 1])
+
+        # Fewer pages later: the index and stale shards go away.
+        write_sitemap(self.public, "https://example.com", pages[:2])
+        self.assertEqual(sorted(os.listdir(self.public)), ["sitemap.xml"])
+        self.assertEqual(len(parse(os.path.join(self.public, "sitemap.xml")).findall("sm:url", NS)), 2)
+
+    def test_byte_limit_starts_new_shard(self):
+        with mock.patch("publish.SITEMAP_BYTES", 400):
+            with SitemapWriter(self.public, "https://example.com") as sitemap:
+                for i in range(5):
+                    sitemap.add(f"/page-{i}.html", 0)
+        self.assertGreater(len(sitemap.files), 2)
+        for name in sitemap.files:
+            self.assertLessEqual(os.path.getsize(os.path.join(self.public, name)), 400)
+
+    def test_feed_keeps_newest_pages(self):
+        pages = [(f"/p{i}.html", f"Page <{i}>", i * 60) for i in range(10)]
+        write_feed(self.public, "https://example.com", "Site & Co", iter(pages), size=3)
+        root = parse(os.path.join(self.public, "feed.xml"))
+        self.assertEqual(root.find("atom:title", NS).text, "Site & Co")
+        self.assertEqual(root.find("atom:author/atom:name", NS).text, "Site & Co")
+        self.assertEqual([title.text for title in root.iterfind("atom:entry/atom:title", NS)],
+                         ["Page <9>", "Page <8>", "Page <7>"])
+        self.assertEqual(root.find("atom:updated", NS).text, "1970-01-01T00:09:00Z")
+
+        write_feed(self.public, "https://example.com", "Site", iter(pages), size=3, author="Ann <ann@x>")
+        root = parse(os.path.join(self.public, "feed.xml"))
+        self.assertEqual(root.find("atom:author/atom:name", NS).text, "Ann <ann@x>")
+
+
+class TestRedirects(unittest.TestCase):
+    def test_update_redirects(self):
+        previous = {"/old.html": "/mid.html", "/back.html": "/x.html", "/dead.html": "/gone.html"}
+        moved = {"/mid.html": "/new.html"}
+        urls = {"/new.html", "/back.html", "/x.html"}
+        self.assertEqual(update_redirects(previous, moved, urls), {"/old.html": "/new.html", "/mid.html": "/new.html"})
+
+
+class TestBuildPublish(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write_source("index.md", "# My Site\n\nhello", 100)
+        self.write_source("blog/post.md", "# A Post\n\nbody", 200)
+        self.write_source("about.md", "no heading here", 300)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_source(self, page, text, mtime):
+        path = os.path.join(self.content, page)
+        with open(path, "w") as f:
+            f.write(text)
+        os.utime(path, (mtime, mtime))
+
+    def build(self):
+        return build_site(self.content, self.public, workers=1, base_url="https://example.com",
+                          feed_size=2, redirects=True, links=True)
+
+    def test_sitemap_feed_and_redirects(self):
+        result = self.build()
+        self.assertEqual(result.broken_links, [])
+        sitemap = parse(os.path.join(self.public, "sitemap.xml"))
+        self.assertEqual([loc.text for loc in sitemap.iterfind("sm:url/sm:loc", NS)],
+                         ["https://example.com/about.html", "https://example.com/blog/post.html",
+                          "https://example.com/index.html"])
+        feed = parse(os.path.join(self.public, "feed.xml"))
+        self.assertEqual(feed.find("atom:title", NS).text, "My Site")
+        self.assertEqual([title.text for title in feed.iterfind("atom:entry/atom:title", NS)],
+                         ["about", "A Post"])
+        self.assertEqual(load_redirects(self.public), {})
+
+        os.rename(os.path.join(self.content, "blog", "post.md"), os.path.join(self.content, "post.md"))
+        self.build()
+        self.assertEqual(load_redirects(self.public), {"/blog/post.html": "/post.html"})
+        os.rename(os.path.join(self.content, "post.md"), os.path.join(self.content, "moved.md"))
+        self.build()
+        self.assertEqual(load_redirects(self.public),
+                         {"/blog/post.html": "/moved.html", "/post.html": "/moved.html"})
+
+
+if __name__ == "__main__":
+    unittest.main()
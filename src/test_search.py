@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from search import (
+    SEARCH_DIR,
+    decode_shard,
+    decode_varint,
+    encode_shard,
+    encode_varint,
+    load_search_index,
+    page_terms,
+    shard_key,
+)
+from textnode import TextNode, TextType
+
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome to the **site**. See [the guide](/guide.html).",
+    "guide.md": "# Guide\n\n- install `pip` first\n- then welcome yourself",
+    "about.md": "Über uns",
+}
+
+
+def terms_by_url(public):
+    urls, postings = load_search_index(public)
+    found = {}
+    for term, docs in postings.items():
+        for doc in docs:
+            found.setdefault(urls[doc], set()).add(term)
+    return found
+
+
+class TestEncoding(unittest.TestCase):
+    def test_varint_round_trip(self):
+        for value in (0, 1, 127, 128, 300, 2 ** 35):
+            out = bytearray()
+            encode_varint(value, out)
+            self.assertEqual(decode_varint(out, 0), (value, len(out)))
+        out = bytearray()
+        encode_varint(300, out)
+        self.assertEqual(bytes(out), b"\xac\x02")
+
+    def test_shard_round_trip_sorts_doc_ids(self):
+        postings = {"welcome": [7, 0, 300], "über": [2]}
+        data = encode_shard(postings)
+        self.assertEqual(decode_shard(data), {"welcome": [0, 7, 300], "über": [2]})
+
+    def test_shard_key(self):
+        self.assertEqual(shard_key("welcome"), "we")
+        self.assertEqual(shard_key("a"), "a")
+        self.assertEqual(shard_key("über"), "_b")
+
+    def test_page_terms_skips_code(self):
+        nodes = [
+            TextNode("Hello, World ", TextType.TEXT),
+            TextNode("pip", TextType.CODE),
+            TextNode("Docs", TextType.LINK, "/docs"),
+        ]
+        self.assertEqual(page_terms(nodes), {"hello", "world", "docs"})
+
+
+class TestBuildSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(self.content)
+        for page, text in PAGES.items():
+            self.write_source(page, text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_source(self, page, text):
+        with open(os.path.join(self.content, page), "w") as f:
+            f.write(text)
+
+    def test_index_contents(self):
+        public = os.path.join(self.tmp.name, "public")
+        result = build_site(self.content, public, workers=1, search=True)
+        found = terms_by_url(public)
+        self.assertEqual(found["/index.html"], {"home", "welcome", "to", "the", "site", "see", "guide"})
+        self.assertEqual(found["/guide.html"], {"guide", "install", "first", "then", "welcome", "yourself"})
+        self.assertEqual(found["/about.html"], {"über", "uns"})
+        self.assertEqual(result.search_terms, 13)
+
+        with open(os.path.join(public, SEARCH_DIR, "index.json")) as f:
+            index = json.load(f)
+        self.assertEqual(index["docs"][1], {"url": "/guide.html", "title": "Guide"})
+        self.assertIn("we", index["shards"])
+        self.assertTrue(os.path.exists(os.path.join(public, SEARCH_DIR, "we.bin")))
+
+    def test_parallel_and_cached_builds_match(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        build_site(self.content, serial, workers=1, search=True)
+        build_site(self.content, parallel, workers=3, inline_cache_size=16, search=True)
+        for name in os.listdir(os.path.join(serial, SEARCH_DIR)):
+            with open(os.path.join(serial, SEARCH_DIR, name), "rb") as a, \
+                    open(os.path.join(parallel, SEARCH_DIR, name), "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_incremental_build_matches_full_build(self):
+        public = os.path.join(self.tmp.name, "public")
+        build_site(self.content, public, workers=1, search=True)
+        self.write_source("guide.md", "# Guide\n\nzebra")
+        os.remove(os.path.join(self.content, "about.md"))
+        self.write_source("blog.md", "Another **welcome**")
+        result = build_site(self.content, public, workers=1, search=True)
+        self.assertEqual(result.rendered, ["blog.md", "guide.md"])
+
+        full = os.path.join(self.tmp.name, "full")
+        build_site(self.content, full, workers=1, search=True)
+        self.assertEqual(terms_by_url(public), terms_by_url(full))
+        self.assertEqual(sorted(os.listdir(os.path.join(public, SEARCH_DIR))),
+                         sorted(os.listdir(os.path.join(full, SEARCH_DIR))))
+        self.assertFalse(os.path.exists(os.path.join(public, SEARCH_DIR, "_b.bin")))
+
+    def test_enabling_search_renders_unindexed_pages(self):
+        public = os.path.join(self.tmp.name, "public")
+        build_site(self.content, public, workers=1)
+        result = build_site(self.content, public, workers=1, search=True)
+        self.assertEqual(len(result.rendered), 3)
+        self.assertEqual(build_site(self.content, public, workers=1, search=True).rendered, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
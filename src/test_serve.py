@@ -0,0 +1,100 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from unittest import mock
+
+from serve import ContentWatcher, DevServer, RELOAD_SCRIPT
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestContentWatcher(unittest.TestCase):
+    def test_reports_changed_and_removed_pages(self):
+        with tempfile.TemporaryDirectory() as content:
+            write(os.path.join(content, "a.md"), "a")
+            write(os.path.join(content, "b.md"), "b")
+            watcher = ContentWatcher(content)
+            self.assertEqual(watcher.poll(), ([], []))
+
+            write(os.path.join(content, "a.md"), "a changed")
+            write(os.path.join(content, "sub", "c.md"), "c")
+            os.remove(os.path.join(content, "b.md"))
+            self.assertEqual(watcher.poll(), (["a.md", os.path.join("sub", "c.md")], ["b.md"]))
+
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "other.md"), "# Other")
+        self.server = DevServer(self.content, self.public, port=0)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.tmp.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.public, name)) as f:
+            return f.read()
+
+    def test_rerender_touches_only_changed_pages(self):
+        os.utime(os.path.join(self.public, "other.html"), ns=(0, 0))
+        write(os.path.join(self.content, "index.md"), "# Changed")
+        self.server.rerender(*self.server.watcher.poll())
+        self.assertEqual(self.read("index.html"), "<div><h1>Changed</h1></div>")
+        self.assertEqual(os.stat(os.path.join(self.public, "other.html")).st_mtime_ns, 0)
+        self.assertEqual(self.server.last_changed, ["/index.html"])
+
+    def test_rerender_skips_pages_that_fail(self):
+        write(os.path.join(self.content, "index.md"), "# Changed")
+        write(os.path.join(self.content, "bad.md"), "**unclosed")
+        write(os.path.join(self.content, "blocked.md"), "# Blocked")
+        # A directory where the page's output file should go.
+        os.makedirs(os.path.join(self.public, "blocked.html", "x"))
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.server.rerender(*self.server.watcher.poll())
+        self.assertEqual(self.read("index.html"), "<div><h1>Changed</h1></div>")
+        self.assertIn("bad.md: Unmatched delimiter", out.getvalue())
+        self.assertIn("Could not render blocked.md", out.getvalue())
+
+    def test_watch_survives_a_failed_poll(self):
+        calls = []
+
+        def poll():
+            calls.append(None)
+            if len(calls) == 1:
+                raise FileNotFoundError("gone")
+            self.server.stopped.set()
+            return [], []
+
+        self.server.interval = 0
+        with mock.patch.object(self.server.watcher, "poll", poll), \
+                contextlib.redirect_stdout(io.StringIO()) as out:
+            self.server.watch()
+        self.assertEqual(len(calls), 2)
+        self.assertIn("failed: gone", out.getvalue())
+
+    def test_serves_pages_with_reload_script(self):
+        thread = threading.Thread(target=self.server.httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            port = self.server.httpd.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/") as response:
+                body = response.read().decode()
+        finally:
+            self.server.httpd.shutdown()
+        self.assertEqual(body, "<div><h1>Home</h1></div>" + RELOAD_SCRIPT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import io
+import os
+import tempfile
+import unittest
+
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compiles_literals_and_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{Content}}</main>")
+        self.assertEqual(template.literals, ("<title>", "</title><main>", "</main>"))
+        self.assertEqual(template.slots, ("Title", "Content"))
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>x</p>"),
+            "<title>Hi</title><main><p>x</p></main>",
+        )
+
+    def test_values_are_not_reparsed(self):
+        template = Template("{{ Content }}")
+        self.assertEqual(template.render(Content="{{ Title }}"), "{{ Title }}")
+
+    def test_write_streams_callable_values(self):
+        out = io.StringIO()
+        Template("<title>{{ Title }}</title>{{ Content }}!").write(
+            out, Title="Hi", Content=lambda f: f.writelines(["<p>", "x", "</p>"]))
+        self.assertEqual(out.getvalue(), "<title>Hi</title><p>x</p>!")
+        with self.assertRaises(ValueError):
+            Template("{{ Title }}").write(io.StringIO(), Content="x")
+
+    def test_missing_value_raises(self):
+        with self.assertRaises(ValueError):
+            Template("{{ Title }}").render(Content="x")
+
+    def test_load_template_caches_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "layout.html")
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            with open(path, "w") as f:
+                f.write("<h2>{{ Title }}</h2>!")
+            second = load_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.render(Title="x"), "<h2>x</h2>!")
+
+
+if __name__ == "__main__":
+    unittest.main()
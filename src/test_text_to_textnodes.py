@@ -0,0 +1,104 @@
+import random
+import unittest
+
+from textnode import TextNode, TextType
+from functions import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+
+
+def staged_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = list(split_nodes_delimiter(nodes, "`", TextType.CODE))
+    nodes = list(split_nodes_delimiter(nodes, "**", TextType.BOLD))
+    nodes = list(split_nodes_delimiter(nodes, "_", TextType.ITALIC))
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+FRAGMENTS = [
+    "a", "b c", " ", "`", "**", "*", "_", "!", "[", "]", "(", ")",
+    "![alt](img.png)", "[link](https://example.com)", "![](x)", "[](y)",
+]
+
+
+class TestTextToTextNodes(unittest.TestCase):
+    def assertMatchesStaged(self, text):
+        try:
+            expected = staged_text_to_textnodes(text)
+        except ValueError:
+            with self.assertRaises(ValueError, msg=repr(text)):
+                text_to_textnodes(text)
+            return
+        self.assertEqual(text_to_textnodes(text), expected, msg=repr(text))
+
+    def test_all_inline_types(self):
+        text = (
+            "This is **text** with an _italic_ word and a `code block` and an "
+            "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
+        )
+        self.assertEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("This is ", TextType.TEXT),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with an ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word and a ", TextType.TEXT),
+                TextNode("code block", TextType.CODE),
+                TextNode(" and an ", TextType.TEXT),
+                TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+                TextNode(" and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ],
+        )
+
+    def test_plain_text(self):
+        self.assertEqual(
+            text_to_textnodes("just words"),
+            [TextNode("just words", TextType.TEXT)],
+        )
+
+    def test_empty_text(self):
+        self.assertEqual(text_to_textnodes(""), [TextNode("", TextType.TEXT)])
+
+    def test_code_hides_other_markup(self):
+        self.assertEqual(
+            text_to_textnodes("`**not bold** [x](y)`"),
+            [TextNode("**not bold** [x](y)", TextType.CODE)],
+        )
+
+    def test_bold_hides_italic(self):
+        self.assertEqual(
+            text_to_textnodes("**snake_case_name**"),
+            [TextNode("snake_case_name", TextType.BOLD)],
+        )
+
+    def test_adjacent_delimiters_keep_fragments_apart(self):
+        self.assertEqual(
+            text_to_textnodes("a``b"),
+            [TextNode("a", TextType.TEXT), TextNode("b", TextType.TEXT)],
+        )
+
+    def test_unmatched_delimiters_raise(self):
+        for text in ["`open", "**open", "_open", "**a `b** c`", "_a**b**c_"]:
+            with self.assertRaises(ValueError, msg=text):
+                text_to_textnodes(text)
+
+    def test_image_wins_over_enclosing_link(self):
+        for text in ["[a![b](c)", "[a](b![x)](y)", "![a](b)[c](d)", "!![a](b)"]:
+            self.assertMatchesStaged(text)
+
+    def test_matches_staged_pipeline_on_random_text(self):
+        rng = random.Random(1234)
+        for _ in range(5000):
+            text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12)))
+            self.assertMatchesStaged(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
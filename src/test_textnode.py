@@ -14,7 +14,13 @@ from functions import (
     split_nodes_image,
     split_nodes_link,
     text_node_to_html_node,
+    markdown_to_html_node,
+    set_inline_cache,
+    set_render_cache,
+    set_text_collector,
 )
+from headings import HeadingIndex
+from lrucache import LRUCache
 
 
 class TestTextNode(unittest.TestCase):
@@ -31,6 +37,14 @@ class TestTextNode(unittest.TestCase):
         self.assertNotEqual(node, node3)
         self.assertNotEqual(node4, node5)
 
+    def test_repr(self):
+        node = TextNode("anchor", TextType.LINK, "https://boot.dev")
+        self.assertEqual(repr(node), "TextNode(anchor, TextType.LINK, https://boot.dev)")
+
+    def test_slotted(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     # --- Bold (**)... ---
@@ -242,5 +256,137 @@ class TestSplitNodesImageAndLink(unittest.TestCase):
             self.assertEqual(html.props, {"href": "https://boot.dev"})
 
 
+class TestTextNodeToHtmlNodeDispatch(unittest.TestCase):
+    def test_every_text_type(self):
+        cases = [
+            (TextNode("t", TextType.TEXT), "t"),
+            (TextNode("b", TextType.BOLD), "<b>b</b>"),
+            (TextNode("i", TextType.ITALIC), "<i>i</i>"),
+            (TextNode("c", TextType.CODE), "<code>c</code>"),
+            (TextNode("a", TextType.LINK, "/a"), '<a href="/a">a</a>'),
+            (TextNode("alt", TextType.IMAGE, "/i.png"), '<img src="/i.png" alt="alt"></img>'),
+        ]
+        for node, html in cases:
+            self.assertEqual(text_node_to_html_node(node).to_html(), html)
+
+    def test_invalid_text_type(self):
+        with self.assertRaises(ValueError):
+            text_node_to_html_node(TextNode("x", "underline"))
+
+
+class TestMarkdownToHtmlNode(unittest.TestCase):
+    def test_paragraphs(self):
+        md = """
+This is **bolded** paragraph
+text in a p
+tag here
+
+This is another paragraph with _italic_ text and `code` here
+
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p>"
+            "<p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_unclosed_fence_runs_to_end(self):
+        self.assertEqual(
+            markdown_to_html_node("Intro\n\n```\n\nSome `code` text.\n\nMore.").to_html(),
+            "<div><p>Intro</p><pre><code>\nSome `code` text.\n\nMore.</code></pre></div>",
+        )
+        self.assertEqual(
+            markdown_to_html_node("```\n\n# Title\n\nBody").to_html(),
+            "<div><pre><code>\n# Title\n\nBody</code></pre></div>",
+        )
+
+    def test_codeblock(self):
+        md = """
+```
+This is text that _should_ remain
+the **same** even with inline stuff
+```
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_headings_quotes_and_lists(self):
+        md = "## Title\n\n> quoted\n> text\n\n- one\n- [two](/two)\n\n1. first\n2. second"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><h2>Title</h2><blockquote>quoted text</blockquote>"
+            '<ul><li>one</li><li><a href="/two">two</a></li></ul>'
+            "<ol><li>first</li><li>second</li></ol></div>",
+        )
+
+    def test_nested_lists(self):
+        md = "- one\n  - **two**\n    1. three\n    2. four\n  continued\n- five\n\n1. a\n   - b"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>one<ul><li><b>two</b><ol><li>three</li><li>four continued</li></ol></li></ul></li>"
+            "<li>five</li></ul><ol><li>a<ul><li>b</li></ul></li></ol></div>",
+        )
+
+    def test_dedent_joins_the_nearest_open_list(self):
+        md = "- a\n    - b\n  - c\n    - d\n- e"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>a<ul><li>b</li></ul></li><li>c<ul><li>d</li></ul></li><li>e</li></ul></div>",
+        )
+
+    def test_nested_quotes(self):
+        md = "> outer\n> text\n>> inner\n> > > deepest\n> back"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><blockquote>outer text<blockquote>inner<blockquote>deepest</blockquote></blockquote>"
+            "back</blockquote></div>",
+        )
+
+    def test_deep_nesting(self):
+        depth = 800
+        md = "\n".join(" " * (2 * i) + f"- {i}" for i in range(depth))
+        md += "\n\n" + "\n".join(">" * (i + 1) + f" {i}" for i in range(depth))
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html.count("<ul>"), depth)
+        self.assertEqual(html.count("<blockquote>"), depth)
+        self.assertIn("<li>799</li>" + "</ul></li>" * (depth - 1) + "</ul>", html)
+
+    def test_render_cache_reuses_blocks(self):
+        md = "# Title\n\nShared **notice**\n\n# Title\n\nShared **notice**"
+        expected = markdown_to_html_node(md).to_html()
+        cache = LRUCache(8)
+        previous = set_render_cache(cache)
+        collected = []
+        previous_collector = set_text_collector(collected)
+        try:
+            self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+            self.assertEqual(cache.counters()["hits"], 2)
+            # Hits still report their text nodes.
+            self.assertEqual([node.text for node in collected], ["Title", "Shared ", "notice"] * 2)
+            # Heading ids depend on the page, so headings bypass the cache.
+            index = HeadingIndex()
+            html = markdown_to_html_node(md, index).to_html()
+            self.assertIn('<h1 id="title-1">Title</h1>', html)
+        finally:
+            set_text_collector(previous_collector)
+            set_render_cache(previous)
+
+    def test_escapes_text_code_and_urls(self):
+        md = "Fish & chips <b>\n\n```\nif a < b:\n```\n\n[x](/q?a=1&b=2) `<tag>`"
+        expected = (
+            "<div><p>Fish &amp; chips &lt;b&gt;</p><pre><code>if a &lt; b:\n</code></pre>"
+            '<p><a href="/q?a=1&amp;b=2">x</a> <code>&lt;tag&gt;</code></p></div>'
+        )
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        previous = set_inline_cache(LRUCache(8))
+        try:
+            for _ in range(2):
+                self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        finally:
+            set_inline_cache(previous)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from writer import OutputWriter, copy_if_changed, write_if_changed
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def test_writes_new_and_changed_files_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a", "b.html")
+            self.assertTrue(write_if_changed(path, b"one"))
+            os.utime(path, ns=(0, 0))
+            self.assertFalse(write_if_changed(path, b"one"))
+            self.assertEqual(os.stat(path).st_mtime_ns, 0)
+            self.assertTrue(write_if_changed(path, b"two"))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"two")
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["b.html"])
+            umask = os.umask(0)
+            os.umask(umask)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~umask)
+
+    def test_copy_if_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "source.html")
+            path = os.path.join(tmp, "a", "b.html")
+            with open(source, "wb") as f:
+                f.write(b"one")
+            self.assertTrue(copy_if_changed(source, path))
+            os.utime(path, ns=(0, 0))
+            self.assertFalse(copy_if_changed(source, path))
+            self.assertEqual(os.stat(path).st_mtime_ns, 0)
+            with open(source, "wb") as f:
+                f.write(b"two")
+            self.assertTrue(copy_if_changed(source, path))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"two")
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["b.html"])
+
+
+class TestOutputWriter(unittest.TestCase):
+    def test_counts_written_and_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with OutputWriter(workers=2, max_pending=2) as writer:
+                for i in range(20):
+                    writer.submit(os.path.join(tmp, f"{i}.html"), f"<p>{i}</p>")
+            self.assertEqual((writer.written, writer.skipped), (20, 0))
+
+            with OutputWriter(workers=2, max_pending=2) as writer:
+                for i in range(20):
+                    writer.submit(os.path.join(tmp, f"{i}.html"), "<p>changed</p>" if i < 5 else f"<p>{i}</p>")
+            self.assertEqual((writer.written, writer.skipped), (5, 15))
+
+    def test_errors_are_raised_on_close(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            blocker = os.path.join(tmp, "file")
+            with open(blocker, "w") as f:
+                f.write("x")
+            writer = OutputWriter()
+            writer.submit(os.path.join(blocker, "page.html"), "<p></p>")
+            with self.assertRaises(OSError):
+                writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import filecmp
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# mkstemp creates files as 0600; published files should get the usual
+# umask-derived mode instead. Read once, since os.umask is process-wide.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_if_changed(path, data):
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # Write next to the target and rename over it, so readers only ever see
+    # the old file or the complete new one.
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return True
+
+
+def copy_if_changed(source, path):
+    # write_if_changed for a file on disk: compared and copied in blocks,
+    # so neither file is ever read whole.
+    if os.path.exists(path) and filecmp.cmp(source, path, shallow=False):
+        return False
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return True
+
+
+class AtomicFile:
+    # A text file written in pieces to a temporary file beside its target
+    # and only renamed into place on commit(), so large generated files are
+    # streamed instead of built as one string. A result identical to the
+    # existing file leaves it untouched, as write_if_changed does.
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+
+    def write(self, text):
+        self._file.write(text)
+
+    def writelines(self, parts):
+        self._file.writelines(parts)
+
+    def commit(self, path=None):
+        path = path or self.path
+        self._file.close()
+        if os.path.exists(path) and filecmp.cmp(self._tmp_path, path, shallow=False):
+            os.remove(self._tmp_path)
+            return False
+        os.chmod(self._tmp_path, 0o666 & ~_UMASK)
+        os.replace(self._tmp_path, path)
+        return True
+
+    def discard(self):
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+
+def remove_output(public_dir, output):
+    path = os.path.join(public_dir, output)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return
+    parent = os.path.dirname(path)
+    while os.path.abspath(parent) != os.path.abspath(public_dir):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+
+
+class OutputWriter:
+    def __init__(self, workers=8, max_pending=256):
+        self.written = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer")
+        self._errors = []
+
+    def submit(self, path, data):
+        # Blocks once max_pending writes are queued. build_site submits pages
+        # as chunks arrive and render_pages keeps only a few chunks in
+        # flight, so rendering cannot run arbitrarily far ahead of the disk.
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._run(write_if_changed, path, data)
+
+    def copy(self, source, path):
+        # Like submit, for a file that already exists on disk.
+        self._run(copy_if_changed, source, path)
+
+    def _run(self, write, *args):
+        self._pending.acquire()
+        try:
+            future = self._executor.submit(self._write, write, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(self._done)
+
+    def _write(self, write, *args):
+        changed = write(*args)
+        with self._lock:
+            if changed:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+    def _done(self, future):
+        self._pending.release()
+        if future.exception() is not None:
+            with self._lock:
+                self._errors.append(future.exception())
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._errors:
+            raise self._errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True)
+        return False